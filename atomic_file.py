@@ -0,0 +1,39 @@
+# Atomic file replacement shared by everything that persists state: the GitMonitor config, the Grafana report schedules
+# and the command sync hashes. Blocking, so callers on the event loop run it through asyncio.to_thread.
+
+import os
+import tempfile
+
+
+def write_atomic(path, text):
+    """Atomically replaces the file at path with text
+    :param path: The file to write
+    :param text: The full file contents
+    :return: None
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    # Persist the rename itself. Not every platform allows opening a directory, so this is best effort.
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
@@ -0,0 +1,135 @@
+import ast
+import asyncio
+import importlib
+import importlib.util
+import json
+import time
+
+COG_CONFIG_FILE = "./config/cogs.json"
+
+
+def read_cog_config(path=COG_CONFIG_FILE):
+    """Reads the extensions to load at startup
+    The file holds {"extensions": [...]}, where each entry is a module name, or {"name": ..., "after": [...]} for an
+    extension which must only load once the extensions it names have loaded.
+    :return: A dictionary of extension name -> list of extensions it loads after
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        config = json.load(file)
+    extensions = {}
+    for entry in config.get("extensions", []):
+        if isinstance(entry, str):
+            extensions[entry] = []
+        else:
+            extensions[entry["name"]] = list(entry.get("after", []))
+    return extensions
+
+
+def plan_waves(extensions):
+    """Groups extensions into waves which can each load concurrently, every extension after the ones it depends on
+    :param extensions: A dictionary of extension name -> list of extensions it loads after
+    :return: A tuple of (list of waves, list of extensions with missing or circular dependencies)
+    """
+    remaining = dict(extensions)
+    placed = set()
+    waves = []
+    while remaining:
+        wave = [name for name, after in remaining.items() if all(dependency in placed for dependency in after)]
+        if not wave:
+            break
+        waves.append(wave)
+        placed.update(wave)
+        for name in wave:
+            del remaining[name]
+    return waves, sorted(remaining)
+
+
+def module_dependencies(name):
+    """Lists the absolute imports at the top level of a module's source, without executing it
+    Relative imports are left out, they are the extension's own modules and are imported when it loads.
+    :param name: The module name
+    :return: A list of module names, empty if the source can't be found or parsed
+    """
+    try:
+        spec = importlib.util.find_spec(name)
+        with open(spec.origin, "r", encoding="utf-8") as file:
+            tree = ast.parse(file.read())
+    except (ImportError, AttributeError, TypeError, OSError, SyntaxError, ValueError):
+        return []
+    dependencies = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            dependencies.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            dependencies.append(node.module)
+    return dependencies
+
+
+def import_dependencies(name):
+    """Imports the dependencies of a module, so its own import finds them in sys.modules. Blocking, so call it through
+    asyncio.to_thread. Failures are left for the module's own import to report.
+    :return: The seconds spent, measured in the thread so time waiting for the event loop isn't counted
+    """
+    started = time.perf_counter()
+    for dependency in module_dependencies(name):
+        try:
+            importlib.import_module(dependency)
+        except Exception:
+            pass
+    return time.perf_counter() - started
+
+
+async def load_extension_timed(bot, name):
+    """Loads one extension, timing the import of its dependencies and the loading of the extension itself
+    Dependencies (discord, aiohttp, the bot's shared modules ...) are imported in a worker thread, concurrently with the
+    other extensions. load_extension then executes the extension's module, once, and runs its setup().
+    :return: A dictionary with name, dependency_seconds, load_seconds and error (None on success)
+    """
+    result = {"name": name, "dependency_seconds": 0.0, "load_seconds": 0.0, "error": None}
+    result["dependency_seconds"] = await asyncio.to_thread(import_dependencies, name)
+    warmed = time.perf_counter()
+    try:
+        await bot.load_extension(name)
+    except Exception as e:
+        result["error"] = e.__cause__ or e
+    result["load_seconds"] = time.perf_counter() - warmed
+    return result
+
+
+async def load_extensions(bot, extensions, logger):
+    """Loads extensions wave by wave, concurrently within each wave. A failing extension doesn't stop the others,
+    only the extensions that load after it.
+    :param bot: The bot
+    :param extensions: A dictionary of extension name -> list of extensions it loads after
+    :param logger: The bot logger, the timing report is logged to it
+    :return: A list of result dictionaries from load_extension_timed, in load order
+    """
+    started = time.perf_counter()
+    waves, unresolved = plan_waves(extensions)
+    results = []
+    failed = set()
+    for wave in waves:
+        skipped = [name for name in wave if failed.intersection(extensions[name])]
+        for name in skipped:
+            results.append({"name": name, "dependency_seconds": 0.0, "load_seconds": 0.0, "error": "a dependency failed"})
+            failed.add(name)
+        wave_results = await asyncio.gather(*(load_extension_timed(bot, name) for name in wave if name not in skipped))
+        for result in wave_results:
+            if result["error"] is not None:
+                failed.add(result["name"])
+        results.extend(wave_results)
+    for name in unresolved:
+        results.append(
+            {"name": name, "dependency_seconds": 0.0, "load_seconds": 0.0, "error": "missing or circular dependency"}
+        )
+
+    logger.info(f"Startup cog loading finished in {time.perf_counter() - started:.2f}s")
+    for result in sorted(results, key=lambda result: result["dependency_seconds"] + result["load_seconds"], reverse=True):
+        if result["error"] is None:
+            logger.info(
+                f"  {result['name']}: dependencies {result['dependency_seconds'] * 1000:.0f} ms, "
+                f"load {result['load_seconds'] * 1000:.0f} ms"
+            )
+        else:
+            logger.error(f"  {result['name']}: failed to load: {result['error']}")
+    return results
@@ -0,0 +1,89 @@
+# Write-behind JSON persistence for the GitMonitor configuration. Changes are marked dirty and flushed after a short
+# debounce (or on unload), and every flush is written to a temp file, fsynced and renamed over the old file off the
+# event loop so a crash mid-write can never leave a truncated config behind.
+
+import asyncio
+import json
+import os
+import time
+
+from atomic_file import write_atomic
+
+
+class JsonConfigStore:
+    """Holds a JSON config file in memory and persists it with debounced, atomic writes"""
+
+    def __init__(self, path, logger, flush_delay=5.0, default_factory=dict):
+        """
+        :param path: The JSON file backing the config
+        :param logger: The bot logger
+        :param flush_delay: Seconds to wait after the first change before writing, so bursts of changes share one write
+        :param default_factory: Called to build the config when the file is missing or unreadable
+        """
+        self.path = path
+        self.logger = logger
+        self.flush_delay = flush_delay
+        self.default_factory = default_factory
+        self.data = None
+        self.dirty = False
+        self._flush_task = None
+        self._lock = asyncio.Lock()
+
+    def load(self):
+        """Loads the config from disk, recovering from a missing or corrupt file
+        A corrupt file is moved aside to <path>.corrupt-<timestamp> so it can be inspected, and the defaults are used.
+        :return: The loaded config
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+            self.logger.info(f"Configuration file loaded: {self.path}")
+        except FileNotFoundError:
+            self.logger.info(f"Configuration file not found, starting with defaults: {self.path}")
+            self.data = self.default_factory()
+        except (ValueError, UnicodeDecodeError) as e:
+            quarantine_path = f"{self.path}.corrupt-{int(time.time())}"
+            self.logger.error(f"Configuration file {self.path} is corrupt ({e}). Moved to {quarantine_path}, using defaults.")
+            try:
+                os.replace(self.path, quarantine_path)
+            except OSError as move_error:
+                self.logger.error(f"Could not move corrupt configuration file: {move_error}")
+            self.data = self.default_factory()
+        return self.data
+
+    def mark_dirty(self):
+        """Flags the config as changed and schedules a debounced flush"""
+        self.dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        # Changes made while a write is running find this task still running, so they are picked up by another pass
+        # here rather than waiting for the next mutation. A failed write is retried the same way.
+        while True:
+            await asyncio.sleep(self.flush_delay)
+            await self.flush()
+            if not self.dirty:
+                return
+
+    async def flush(self):
+        """Writes the config to disk if it has changed since the last flush"""
+        async with self._lock:
+            if not self.dirty:
+                return
+            # Serialise on the event loop so the snapshot is consistent, then do the disk work in a thread
+            text = json.dumps(self.data, indent=4)
+            self.dirty = False
+            try:
+                await asyncio.to_thread(write_atomic, self.path, text)
+                self.logger.info(f"Configuration saved to {self.path}")
+            except Exception as e:
+                self.dirty = True
+                self.logger.error(f"Error saving configuration to {self.path}: {e}")
+
+    async def close(self):
+        """Cancels any pending debounce timer and flushes outstanding changes"""
+        if self._flush_task and not self._flush_task.done() and self._flush_task is not asyncio.current_task():
+            self._flush_task.cancel()
+        self._flush_task = None
+        await self.flush()
@@ -9,62 +9,90 @@ import discord
 from discord.ext import commands, tasks
 import aiohttp
 import json
-import os
+import time
 
-from dotenv import load_dotenv
 from datetime import datetime 
+from settings import get_settings
+from .config_store import JsonConfigStore
+from .mirror import GitMirror, GitMirrorError, check_remote_url
+from .notifier import ChannelNotifier
+
+CONFIG_FILE = "./config/gitmonitor_config.json"
 
 class GitMonitor(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.logger = bot.logger
-        load_dotenv()
+        settings = get_settings()
         self.session = aiohttp.ClientSession()
+        self.config_store = JsonConfigStore(CONFIG_FILE, self.logger, flush_delay=settings.gitmonitor_config_flush_seconds)
         self.config = self.load_config()
         self.commit_check_loop.start()
-        self.api_key = os.getenv('GITMONITOR_TOKEN')
+        self.api_key = settings.gitmonitor_token
+        # When more commits than the backfill cap land between checks, only the newest are posted and the rest are summarised
+        self.backfill_cap = settings.gitmonitor_backfill_cap
+        self.max_pages = settings.gitmonitor_max_pages
+        # Notifications are queued per channel and sent up to 10 embeds per message
+        self.notifier = ChannelNotifier(self.logger, send_interval=settings.gitmonitor_send_interval_seconds)
+        # Poll mode: "commits" polls the List Commits endpoint, "events" polls the repository Events API with conditional
+        # requests. Unchanged events responses (304) are free against the rate limit, so the loop can run much more often.
+        self.poll_mode = settings.gitmonitor_poll_mode
+        self.events_next_poll = {}
+        if self.poll_mode == "events":
+            self.commit_check_loop.change_interval(seconds=settings.gitmonitor_events_interval_seconds)
+        # Repos with a mirror_url are checked against a local bare mirror instead of the REST API
+        self.mirror = GitMirror(settings.gitmonitor_mirror_dir, self.logger, api_key=self.api_key,
+                                allowed_schemes=settings.gitmonitor_mirror_schemes)
         
         if not self.api_key:
             self.logger.error("Missing required GitMonitor dotenv variables")
             raise ValueError("Missing required GitMonitor dotenv variables")
-        
 
-    # Close the aiohttp session when the cog is unloaded. 
-    def cog_unload(self):
+        # Optional webhook receiver mode. When GITMONITOR_WEBHOOK_SECRET is set, GitHub push deliveries are posted as they
+        # arrive and the poll loop only checks repos which have not had a webhook delivery within the fallback window.
+        self.webhook_server = None
+        self.webhook_seen = {}
+        self.webhook_fallback_seconds = settings.gitmonitor_webhook_fallback_hours * 3600
+        webhook_secret = settings.gitmonitor_webhook_secret
+        if webhook_secret:
+            # Imported here since aiohttp.web is only needed in webhook mode
+            from .webhook import GitHubWebhookServer
+
+            self.webhook_server = GitHubWebhookServer(
+                webhook_secret,
+                self.handle_webhook_push,
+                self.logger,
+                host=settings.gitmonitor_webhook_host,
+                port=settings.gitmonitor_webhook_port,
+                path=settings.gitmonitor_webhook_path,
+            )
+
+    # Start the webhook receiver once the cog has been added to the bot.
+    async def cog_load(self):
+        if self.webhook_server:
+            await self.webhook_server.start()
+
+    # Close the aiohttp session and flush any pending configuration changes when the cog is unloaded.
+    async def cog_unload(self):
         self.commit_check_loop.cancel()
-        self.bot.loop.create_task(self.session.close())
+        if self.webhook_server:
+            await self.webhook_server.stop()
+        await self.notifier.close()
+        await self.config_store.close()
+        await self.session.close()
         print("GitMonitor cog unloaded. HTTP session closed.") #! Debug print
         self.logger.info("GitMonitor cog unloaded. HTTP session closed.")
         
 
     # Load and save configuration
+    # The config is keyed by guild id. A missing or corrupt file starts an empty config rather than failing the cog load.
     def load_config(self):
-        CONFIG_FILE = "./config/gitmonitor_config.json"
-        try: 
-            with open(CONFIG_FILE, "r") as f:
-                return json.load(f)
-            print(f'Configuration file loaded: {CONFIG_FILE}') #! Debug print
-        # If the configuration file is not found or it is the first time loading the cog, create a new config with default settings
-        except FileNotFoundError as e:
-            print(f'Configuration file not found: {e}') #! Debug print
-            self.logger.error(f"Configuration file not found: {e}")
-            return {}
-        default_config = {"watchlist": {}, "notification_channel": None}
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(default_config, f, indent=4)
-        return default_config
-
+        return self.config_store.load()
 
+    # Changes are written behind: the store is marked dirty and flushed atomically off the event loop after a short debounce.
     def save_config(self):
-        CONFIG_FILE = "./config/gitmonitor_config.json"
-        try: 
-            with open(CONFIG_FILE, "w") as f:
-                json.dump(self.config, f, indent=4)
-            print(f"Configuration saved to {CONFIG_FILE}") #! Debug print
-            self.logger.info(f"Configuration saved to {CONFIG_FILE}")
-        except Exception as e:
-            print(f"Error saving configuration: {e}") #! Debug print
-            self.logger.error(f"Error saving configuration")
+        self.config_store.mark_dirty()
+        self.logger.debug(f"Configuration marked for saving to {CONFIG_FILE}")
         
 
     # Background commit checking loop which interacts with the GitHub API. 
@@ -76,9 +104,9 @@ class GitMonitor(commands.Cog):
         for guild_id, guild_data in self.config.items():
             print(f"Checking commits for {guild_id}") #! Debug print
             self.logger.debug(f"Checking commits for {guild_id}")
-            await self.check_guild_repos(guild_id, guild_data)
+            await self.check_guild_repos(guild_id, guild_data, skip_webhook_fed=True)
 
-    async def check_guild_repos(self, guild_id, guild_data):
+    async def check_guild_repos(self, guild_id, guild_data, skip_webhook_fed=False):
         print(f"Checking repos for {guild_id}") #! Debug print
         self.logger.debug(f"Checking repos for {guild_id}")
         if not self.api_key:
@@ -92,9 +120,17 @@ class GitMonitor(commands.Cog):
                 self.logger.info(f"Monitoring is disabled for {repo_name}. Skipping.")
                 continue
         for repo_name, repo_data in guild_data.get("watchlist", {}).items():
+            if skip_webhook_fed and self.is_webhook_fed(repo_name):
+                self.logger.debug(f"{repo_name} is receiving webhook deliveries. Skipping poll.")
+                continue
             print(f"Checking {repo_name} for commits") #! Debug print
             self.logger.debug(f"Checking {repo_name} for commits")
-            await self.check_repo_commits(guild_id, self.api_key, repo_name, repo_data)
+            if repo_data.get("mirror_url"):
+                await self.check_repo_mirror(guild_id, repo_name, repo_data)
+            elif self.poll_mode == "events":
+                await self.check_repo_events(guild_id, self.api_key, repo_name, repo_data)
+            else:
+                await self.check_repo_commits(guild_id, self.api_key, repo_name, repo_data)
 
     async def check_repo_commits(self, guild_id, api_key, repo_name, repo_data):
         if not repo_data["enabled"]:
@@ -105,86 +141,285 @@ class GitMonitor(commands.Cog):
         print(f"Last seen SHA for {repo_name}: {last_commit_sha}")  # Debug print
 
         try:
-            commits = await self.fetch_commits(api_key, repo_name, last_commit_sha)
+            commits, gap_closed = await self.fetch_commits(api_key, repo_name, last_commit_sha)
             if not commits:
                 print(f"No new commits for {repo_name}.")  # Debug print
                 return
 
-            # Process the latest commit (most recent first)
-            for commit in reversed(commits):
-                await self.post_commit(int(guild_id), repo_name, commit)
-
-            # Update the last seen commit SHA
-            latest_commit_sha = commits[0]["sha"]
-            self.config[guild_id]["watchlist"][repo_name]["last_commit_sha"] = latest_commit_sha
+            await self.deliver_commits(guild_id, repo_name, commits, gap_closed)
             self.save_config()
         except Exception as e:
             print(f"Error checking {repo_name} in {guild_id}: {e}")
+            self.logger.error(f"Error checking {repo_name} in {guild_id}: {e}")
+
+    # Mirror mode: fetch the new objects into the local mirror and walk the history locally.
+    async def check_repo_mirror(self, guild_id, repo_name, repo_data):
+        if not repo_data["enabled"]:
+            self.logger.debug(f"{repo_name} monitoring is disabled. Skipping.")
+            return
+        mirror_url = repo_data["mirror_url"]
+        html_base = f"https://github.com/{repo_name}" if mirror_url.startswith("https://github.com/") else None
+        try:
+            await self.mirror.fetch(repo_name, mirror_url)
+            commits, gap_closed = await self.mirror.new_commits(repo_name, repo_data.get("last_commit_sha"),
+                                                               limit=self.max_pages * 100, html_base=html_base)
+            if not commits:
+                self.logger.debug(f"No new commits for {repo_name}.")
+                return
+            await self.deliver_commits(guild_id, repo_name, commits, gap_closed)
+            self.save_config()
+        except Exception as e:
+            self.logger.error(f"Error checking mirror of {repo_name} in {guild_id}: {e}")
+
+    # Events mode: one conditional request per repo surfaces pushes, releases, pull requests and tags. GitHub's
+    # X-Poll-Interval header sets the minimum time before the repo is polled again.
+    async def check_repo_events(self, guild_id, api_key, repo_name, repo_data):
+        if not repo_data["enabled"]:
+            self.logger.debug(f"{repo_name} monitoring is disabled. Skipping.")
+            return
+        poll_key = f"{guild_id}/{repo_name}"
+        if time.monotonic() < self.events_next_poll.get(poll_key, 0):
+            self.logger.debug(f"Respecting X-Poll-Interval for {repo_name}. Skipping.")
+            return
+
+        try:
+            events = await self.fetch_events(api_key, poll_key, repo_name, repo_data)
+            if events is None:
+                return
+            last_event_id = repo_data.get("last_event_id")
+            new_events = [event for event in events if last_event_id is None or int(event["id"]) > int(last_event_id)]
+            if events:
+                repo_data["last_event_id"] = max(events, key=lambda event: int(event["id"]))["id"]
+            self.save_config()
+            # The first poll only records where the stream currently is, rather than replaying old events
+            if last_event_id is None or not new_events:
+                return
+
+            self.logger.debug(f"{len(new_events)} new events for {repo_name}.")
+            pushed = False
+            for event in sorted(new_events, key=lambda event: int(event["id"])):
+                if event["type"] == "PushEvent":
+                    # Push events don't reliably carry the commit list, so fetch the commits through the normal path once
+                    if not pushed:
+                        pushed = True
+                        await self.check_repo_commits(guild_id, api_key, repo_name, repo_data)
+                    continue
+                embed = self.build_event_embed(repo_name, event)
+                if embed:
+                    channel = self.get_notification_channel(int(guild_id))
+                    if channel:
+                        self.notifier.enqueue(channel, embed)
+                        self.logger.info(f"{event['type']} notification queued - Repo: {repo_name}, Channel: {channel}")
+        except Exception as e:
+            self.logger.error(f"Error checking events for {repo_name} in {guild_id}: {e}")
+
+    # Using the GitHub API List Repository Events endpoint with If-None-Match. Returns None when nothing has changed.
+    async def fetch_events(self, api_key, poll_key, repo_name, repo_data):
+        self.logger.debug(f"Fetching events for {repo_name}")
+        url = f"https://api.github.com/repos/{repo_name}/events"
+        headers = {"Authorization": f"token {api_key}"}
+        if repo_data.get("events_etag"):
+            headers["If-None-Match"] = repo_data["events_etag"]
+        async with self.session.get(url, headers=headers, params={"per_page": 100}) as resp:
+            poll_interval = int(resp.headers.get("X-Poll-Interval", "60"))
+            self.events_next_poll[poll_key] = time.monotonic() + poll_interval
+            if resp.status == 304:
+                self.logger.debug(f"No new events for {repo_name}")
+                return None
+            resp.raise_for_status()
+            events = await resp.json()
+            if resp.headers.get("ETag"):
+                repo_data["events_etag"] = resp.headers["ETag"]
+            return events
+
+    # Build a notification embed for a non-push repository event, or None if the event isn't one we announce.
+    def build_event_embed(self, repo_name, event):
+        payload = event.get("payload") or {}
+        event_type = event["type"]
+        if event_type == "ReleaseEvent" and payload.get("action") == "published":
+            release = payload["release"]
+            title = f"New Release: {repo_name}"
+            description = f"**{release.get('name') or release['tag_name']}**\n{release.get('body') or ''}"
+            url = release["html_url"]
+        elif event_type == "PullRequestEvent" and payload.get("action") in ("opened", "closed", "reopened"):
+            pull_request = payload["pull_request"]
+            action = "merged" if payload["action"] == "closed" and pull_request.get("merged") else payload["action"]
+            title = f"Pull Request {action.capitalize()}: {repo_name}"
+            description = f"**#{pull_request['number']} {pull_request['title']}**"
+            url = pull_request["html_url"]
+        elif event_type == "CreateEvent" and payload.get("ref_type") == "tag":
+            title = f"New Tag: {repo_name}"
+            description = f"**{payload['ref']}**"
+            url = f"https://github.com/{repo_name}/releases/tag/{payload['ref']}"
+        else:
+            return None
+        # Embed descriptions are capped at 4096 characters
+        embed = discord.Embed(title=title, description=description[:4096], url=url, color=discord.Color.purple())
+        actor = event.get("actor") or {}
+        embed.set_author(name=actor.get("login"), icon_url=actor.get("avatar_url"))
+        embed.add_field(name="Repository", value=f"[{repo_name}](https://github.com/{repo_name})")
+        embed.add_field(name="Date", value=event.get("created_at"), inline=True)
+        return embed
+
+    # Post a list of commits (most recent first, as returned by the GitHub API) oldest first and record the newest SHA.
+    # Only the newest backfill_cap commits are posted individually, anything older is rolled up into a single summary.
+    # gap_closed is False when the last seen SHA was not reached, so the number of skipped commits is a lower bound.
+    async def deliver_commits(self, guild_id, repo_name, commits, gap_closed=True):
+        repo_data = self.config[guild_id]["watchlist"][repo_name]
+        posted_commits = commits[:self.backfill_cap]
+        omitted = len(commits) - len(posted_commits)
+        if omitted or not gap_closed:
+            newest_omitted_sha = commits[len(posted_commits)]["sha"] if omitted else None
+            await self.post_commit_summary(int(guild_id), repo_name, omitted, gap_closed,
+                                           repo_data.get("last_commit_sha"), newest_omitted_sha)
+        for commit in reversed(posted_commits):
+            await self.post_commit(int(guild_id), repo_name, commit)
+
+        # Update the last seen commit SHA, dropping the last_commit_date earlier versions stored for `since`
+        repo_data["last_commit_sha"] = commits[0]["sha"]
+        repo_data.pop("last_commit_date", None)
+
+    def is_webhook_fed(self, repo_name):
+        last_delivery = self.webhook_seen.get(repo_name.lower())
+        return last_delivery is not None and time.monotonic() - last_delivery < self.webhook_fallback_seconds
+
+    # Called by the webhook receiver for every verified push to a repository's default branch.
+    async def handle_webhook_push(self, repo_name, commits):
+        self.webhook_seen[repo_name.lower()] = time.monotonic()
+        delivered = False
+        for guild_id, guild_data in self.config.items():
+            for watched_repo, repo_data in guild_data.get("watchlist", {}).items():
+                # Repositories are added by hand, so match the webhook's full_name case-insensitively
+                if watched_repo.lower() != repo_name.lower() or not repo_data.get("enabled", True):
+                    continue
+                # Skip commits already posted by the poller or a redelivered webhook
+                last_commit_sha = repo_data.get("last_commit_sha")
+                new_commits = commits
+                for index, commit in enumerate(commits):
+                    if commit["sha"] == last_commit_sha:
+                        new_commits = commits[:index]
+                        break
+                if not new_commits:
+                    continue
+                self.logger.debug(f"Webhook delivering {len(new_commits)} commits for {watched_repo} to {guild_id}")
+                await self.deliver_commits(guild_id, watched_repo, new_commits)
+                delivered = True
+        if delivered:
+            self.save_config()
 
     # Using the GitHub API List Commits endpoint to fetch the commits for a repository.
+    # Returns (new_commits, gap_closed). Pages are followed through the Link header until last_commit_sha is found, up to
+    # max_pages, which also bounds the walk when a force push removed the last seen SHA. The walk isn't bounded with
+    # `since`: commits brought in by a merge keep their older committer dates, so they would be filtered out.
     async def fetch_commits(self, api_key, repo_name, last_commit_sha=None):
         print(f"Fetching commits for {repo_name}") #! Debug print
         self.logger.debug(f"Fetching commits for {repo_name}")
         try: 
             url = f"https://api.github.com/repos/{repo_name}/commits"
             headers = {"Authorization": f"token {api_key}"}
-            async with self.session.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                commits = await resp.json()
-
-            # Filter for commits after last_commit_sha and put them in a list
-            if last_commit_sha:
-                    new_commits = []
-                    for commit in commits:
-                        if commit["sha"] == last_commit_sha:
-                            break  
-                        new_commits.append(commit)
-                    print(f"Filtered {len(new_commits)} new commits for {repo_name}")  #! Debug print
-                    self.logger.debug(f"Filtered {len(new_commits)} new commits for {repo_name}")
-                    return new_commits
-
-            # If no last_commit_sha, return all commits
-            return commits
+
+            # No SHA recorded means the repo was just added: only announce the latest commit rather than the whole history
+            if not last_commit_sha:
+                async with self.session.get(url, headers=headers, params={"per_page": 1}) as resp:
+                    resp.raise_for_status()
+                    return await resp.json(), True
+
+            params = {"per_page": 100}
+            new_commits = []
+            pages = 0
+            while url and pages < self.max_pages:
+                async with self.session.get(url, headers=headers, params=params) as resp:
+                    resp.raise_for_status()
+                    commits = await resp.json()
+                    next_page = resp.links.get("next", {}).get("url")
+                pages += 1
+                # The next page URL already carries the query string
+                url, params = (str(next_page), None) if next_page else (None, None)
+
+                # Filter for commits after last_commit_sha and put them in a list
+                for commit in commits:
+                    if commit["sha"] == last_commit_sha:
+                        print(f"Filtered {len(new_commits)} new commits for {repo_name}")  #! Debug print
+                        self.logger.debug(f"Filtered {len(new_commits)} new commits for {repo_name} across {pages} pages")
+                        return new_commits, True
+                    new_commits.append(commit)
+
+            # Either the history ran out without reaching the SHA (e.g. after a force push) or we hit max_pages
+            gap_closed = url is None
+            self.logger.warning(f"Last seen commit {last_commit_sha} not found for {repo_name} after {pages} pages. {len(new_commits)} commits collected.")
+            return new_commits, gap_closed
         
         except Exception as e:
             print(f"Error fetching commits for {repo_name}: {e}")  # Debug print
             self.logger.error(f"Error fetching commits for {repo_name}: {e}")
-            return []
-                
-    # Post commit notification to the  notification channel.
-    async def post_commit(self, guild_id, repo_name, commit_data):
+            return [], True
+
+    # Post a single notification summarising commits which were not posted individually.
+    async def post_commit_summary(self, guild_id, repo_name, omitted, gap_closed, last_commit_sha, newest_omitted_sha):
+        channel = self.get_notification_channel(guild_id)
+        if not channel:
+            return
+        count = f"{omitted}" if gap_closed else f"{omitted}+"
+        if last_commit_sha and gap_closed:
+            # Compare from the last commit we announced up to the newest commit we are not posting individually
+            link = f"https://github.com/{repo_name}/compare/{last_commit_sha}...{newest_omitted_sha}"
+        else:
+            link = f"https://github.com/{repo_name}/commits"
+        if omitted:
+            description = f"... and {count} more commits since the last check. [View on GitHub]({link})"
+        else:
+            description = f"Older commits since the last check could not be listed. [View on GitHub]({link})"
+        embed = discord.Embed(title=f"New Commit Notification: {repo_name}",
+                              description=description,
+                              color=discord.Color.purple())
+        self.notifier.enqueue(channel, embed)
+        self.logger.info(f"Commit summary queued - Repo: {repo_name}, Channel: {channel}, Omitted: {count}")
+
+    # Look up the configured notification channel for a guild, or None if the guild or channel is unavailable.
+    def get_notification_channel(self, guild_id):
         guild = self.bot.get_guild(guild_id)
-        print(f"Posting commit for {repo_name} to server {guild_id}") #! Debug print
         if not guild:
             print(f"No guild found for {guild_id}. Exiting.") #! Debug print
-            return
+            return None
         channel_id = self.config[str(guild_id)].get("notification_channel")
-        channel = guild.get_channel(channel_id)
         print(f"Git notification channel: {channel_id}") #! Debug print
+        return guild.get_channel(channel_id)
+                
+    # Queue a commit notification for the notification channel. The notifier batches queued commits into shared messages.
+    async def post_commit(self, guild_id, repo_name, commit_data):
+        print(f"Posting commit for {repo_name} to server {guild_id}") #! Debug print
+        channel = self.get_notification_channel(guild_id)
         if not channel:
             return
         try:
-            print(f"Sending commit notification for {repo_name} in {channel}") #! Debug print
-            self.logger.debug(f"Sending commit notification for {repo_name} in {channel}")
+            print(f"Queueing commit notification for {repo_name} in {channel}") #! Debug print
+            self.logger.debug(f"Queueing commit notification for {repo_name} in {channel}")
             embed = discord.Embed(title=f"New Commit Notification: {repo_name}",
                                   description=commit_data["commit"]["message"],
                                   color=discord.Color.purple())
             print(f"Embed created for commit.") #! Debug print
             self.logger.debug(f"Embed created for commit.")
+            # The REST API returns a null author when the commit email is not linked to a GitHub account
             embed.set_author(name=commit_data["commit"]["author"]["name"],
-                             icon_url=commit_data["author"]["avatar_url"])
+                             icon_url=(commit_data.get("author") or {}).get("avatar_url"))
             embed.add_field(name="Repository",
                             value=f"[{repo_name}](https://github.com/{repo_name})")
-            embed.add_field(name="Commit URL", value=commit_data["html_url"], inline=False)
+            embed.add_field(name="Commit URL", value=commit_data["html_url"] or commit_data["sha"], inline=False)
             embed.add_field(name="Author", value=commit_data["commit"]["author"]["name"], inline=True)
             embed.add_field(name="Date", value=commit_data["commit"]["author"]["date"], inline=True)
-            print(f"Commit notification sent - Repo: {repo_name}, Channel: {channel}, Author: {commit_data["commit"]["author"]}, Repository: https://github.com/{repo_name}, Date: {commit_data["commit"]["author"]["date"]} ") #! Debug print
-            self.logger.info(f"Commit notification sent - Repo: {repo_name}, Channel: {channel}, Author: {commit_data["commit"]["author"]}, Repository: https://github.com/{repo_name}, Date: {commit_data["commit"]["author"]["date"]} ")
-            await channel.send(embed=embed)
+            # Mirrored commits carry a locally computed diffstat
+            if commit_data.get("stats"):
+                stats = commit_data["stats"]
+                embed.add_field(name="Changes",
+                                value=f"{stats['files_changed']} files, +{stats['additions']} -{stats['deletions']}",
+                                inline=True)
+            print(f"Commit notification queued - Repo: {repo_name}, Channel: {channel}, Author: {commit_data['commit']['author']}, Repository: https://github.com/{repo_name}, Date: {commit_data['commit']['author']['date']} ") #! Debug print
+            self.logger.info(f"Commit notification queued - Repo: {repo_name}, Channel: {channel}, Author: {commit_data['commit']['author']}, Repository: https://github.com/{repo_name}, Date: {commit_data['commit']['author']['date']} ")
+            self.notifier.enqueue(channel, embed)
             
         except Exception as e:
-            print(f"Error sending commit notification for {repo_name} in {guild_id}: {e}")
-            self.logger.error(f"Error sending commit notification for {repo_name} in {guild_id}: {e}")
+            print(f"Error queueing commit notification for {repo_name} in {guild_id}: {e}")
+            self.logger.error(f"Error queueing commit notification for {repo_name} in {guild_id}: {e}")
 
     @commands.group()
     async def gitmonitor(self, ctx):
@@ -201,7 +436,9 @@ class GitMonitor(commands.Cog):
             "channel": "View the current git monitor notification channel.",
             "removerepo {user}/{repo}": "Remove a repo from the watchlist.",
             "repos": "View the current GitHub watchlist.",
-            "checkrepos": "Manually check for commits in the watchlist."
+            "checkrepos": "Manually check for commits in the watchlist.",
+            "mirror {user}/{repo} [url]": "Check a repo through a local git mirror instead of the GitHub API.",
+            "unmirror {user}/{repo}": "Go back to checking a repo through the GitHub API."
         }
         embed = discord.Embed(title="GitMonitor Commands", color=discord.Color.purple())
         for command, description in commands.items():
@@ -228,10 +465,7 @@ class GitMonitor(commands.Cog):
         if guild_id not in self.config:
             print(f"Creating new guild entry for {guild_id} in the configuration.") #! Debug print
             self.logger.info(f"Creating new guild entry for {guild_id} in the configuration.")
-            self.config[guild_id]["watchlist"][repository] = {
-                "enabled": True,
-                "last_commit_sha": None
-            }
+            self.config[guild_id] = {"watchlist": {}, "notification_channel": None}
         if repository in self.config[guild_id]["watchlist"]:
             print(f"{repository} is already in the watchlist.") #! Debug print
             self.logger.info(f"{repository} is already in the watchlist.")
@@ -246,6 +480,38 @@ class GitMonitor(commands.Cog):
             self.save_config()
             await ctx.send(f"Added {repository} to the watchlist.")
 
+    @gitmonitor.command()
+    @commands.has_permissions(manage_guild=True, manage_messages=True)
+    async def mirror(self, ctx, repository: str, url: str = None):
+        """Check a repo through a local git mirror. Use the format {user}/{repo}, the url defaults to GitHub"""
+        guild_id = str(ctx.guild.id)
+        if guild_id not in self.config or repository not in self.config[guild_id]["watchlist"]:
+            await ctx.send(f"{repository} is not in the watchlist.")
+            return
+        mirror_url = url or f"https://github.com/{repository}.git"
+        try:
+            check_remote_url(mirror_url, self.mirror.allowed_schemes)
+        except GitMirrorError as e:
+            await ctx.send(str(e))
+            return
+        self.config[guild_id]["watchlist"][repository]["mirror_url"] = mirror_url
+        self.save_config()
+        self.logger.info(f"{repository} will be checked through a local mirror of {mirror_url}")
+        await ctx.send(f"{repository} will be checked through a local mirror of {mirror_url}")
+
+    @gitmonitor.command()
+    @commands.has_permissions(manage_guild=True, manage_messages=True)
+    async def unmirror(self, ctx, repository: str):
+        """Go back to checking a repo through the GitHub API. Use the format {user}/{repo}"""
+        guild_id = str(ctx.guild.id)
+        if guild_id not in self.config or repository not in self.config[guild_id]["watchlist"]:
+            await ctx.send(f"{repository} is not in the watchlist.")
+            return
+        self.config[guild_id]["watchlist"][repository].pop("mirror_url", None)
+        self.save_config()
+        self.logger.info(f"{repository} will be checked through the GitHub API")
+        await ctx.send(f"{repository} will be checked through the GitHub API")
+
     @gitmonitor.command()
     @commands.has_permissions(manage_guild=True, manage_messages=True)
     async def setchannel(self, ctx, channel: discord.TextChannel):
@@ -309,8 +575,8 @@ class GitMonitor(commands.Cog):
             print(f"{guild_id} watchlist is empty.") #! Debug print
             await ctx.send("The watchlist is empty.")
             return
-        print(f"{guild_id} watchlist: {self.config[guild_id]["watchlist"]}") #! Debug print
-        self.logger.debug(f"{guild_id} watchlist: {self.config[guild_id]["watchlist"]}")
+        print(f"{guild_id} watchlist: {self.config[guild_id]['watchlist']}") #! Debug print
+        self.logger.debug(f"{guild_id} watchlist: {self.config[guild_id]['watchlist']}")
         watchlist = self.config[guild_id]["watchlist"]
         embed = discord.Embed(title="GitHub Watchlist", color=discord.Color.purple())
         print(f"Embed created for watchlist.") #! Debug print
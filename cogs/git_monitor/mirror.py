@@ -0,0 +1,174 @@
+# Local git mirror mode for the GitMonitor cog. Keeps a bare mirror of each repository on disk, runs an incremental
+# `git fetch` in a worker thread and walks the local history to find new commits, so mirrored repos never touch the
+# GitHub REST API or its rate limit.
+
+import asyncio
+import base64
+import os
+import re
+import shutil
+import subprocess
+from urllib.parse import urlsplit
+
+# Separators used in the `git log` format string, chosen because they can't appear in commit metadata
+RECORD_SEPARATOR = "\x1e"
+FIELD_SEPARATOR = "\x1f"
+LOG_FORMAT = f"{RECORD_SEPARATOR}%H{FIELD_SEPARATOR}%an{FIELD_SEPARATOR}%ae{FIELD_SEPARATOR}%aI{FIELD_SEPARATOR}%cI{FIELD_SEPARATOR}%B{FIELD_SEPARATOR}"
+SHORTSTAT_PATTERN = re.compile(r"(\d+) files? changed(?:, (\d+) insertions?\(\+\))?(?:, (\d+) deletions?\(-\))?")
+
+
+class GitMirrorError(Exception):
+    """Raised when a git command against a mirror fails"""
+
+
+def check_remote_url(url, allowed_schemes):
+    """Refuses mirror urls whose scheme isn't allowed, so a watchlist entry can't make the bot fetch local paths
+    (file://, scp-like host:path) or other transports
+    :param url: The remote url
+    :param allowed_schemes: The allowed url schemes, e.g. ["https"]
+    :raise GitMirrorError: If the url isn't scheme://... with an allowed scheme
+    """
+    scheme = urlsplit(url).scheme.lower()
+    if scheme not in allowed_schemes or not url.lower().startswith(f"{scheme}://"):
+        allowed = " or ".join(f"{allowed_scheme}://" for allowed_scheme in allowed_schemes)
+        raise GitMirrorError(f"Mirror urls must start with {allowed}")
+
+
+def parse_log(output, html_base=None):
+    """Parses `git log --shortstat` output produced with LOG_FORMAT
+    Commits are returned newest first in the shape of the REST List Commits endpoint, with an added `stats` entry.
+    :param output: The stdout of git log
+    :param html_base: Base URL for commit links, e.g. https://github.com/{repo}. No links are added when None.
+    :return: A list of commit dicts
+    """
+    commits = []
+    for record in output.split(RECORD_SEPARATOR)[1:]:
+        sha, author_name, author_email, author_date, committer_date, message, stat = record.split(FIELD_SEPARATOR)
+        stats = {"files_changed": 0, "additions": 0, "deletions": 0, "total": 0}
+        match = SHORTSTAT_PATTERN.search(stat)
+        if match:
+            stats["files_changed"] = int(match.group(1))
+            stats["additions"] = int(match.group(2) or 0)
+            stats["deletions"] = int(match.group(3) or 0)
+            stats["total"] = stats["additions"] + stats["deletions"]
+        commits.append({
+            "sha": sha,
+            "html_url": f"{html_base}/commit/{sha}" if html_base else None,
+            "commit": {
+                "message": message.strip(),
+                "author": {"name": author_name, "email": author_email, "date": author_date},
+                "committer": {"date": committer_date},
+            },
+            "author": None,
+            "stats": stats,
+        })
+    return commits
+
+
+class GitMirror:
+    """Manages bare mirrors of watched repositories under a base directory"""
+
+    def __init__(self, base_dir, logger, api_key=None, timeout=300, allowed_schemes=("https",)):
+        """
+        :param base_dir: Directory holding one bare repository per mirrored repo
+        :param logger: The bot logger
+        :param api_key: GitHub token used for https://github.com remotes, so private repos can be fetched
+        :param timeout: Seconds before a git command is abandoned
+        :param allowed_schemes: The url schemes mirrors may be fetched over, see check_remote_url
+        """
+        self.base_dir = base_dir
+        self.logger = logger
+        self.api_key = api_key
+        self.allowed_schemes = list(allowed_schemes)
+        self.timeout = timeout
+        self.locks = {}
+
+    def mirror_path(self, repo_name):
+        """The on-disk location of the bare mirror for a repository"""
+        return os.path.join(self.base_dir, repo_name.replace("/", "__") + ".git")
+
+    def run_git(self, args, cwd=None, url=None):
+        """Runs a git command synchronously and returns stdout. Call through asyncio.to_thread.
+        :param args: Arguments after `git`
+        :param cwd: Working directory, normally the mirror path
+        :param url: The remote URL, used to decide whether to send the GitHub token
+        :return: The decoded stdout
+        """
+        command = ["git"]
+        if url and self.api_key and url.startswith("https://github.com/"):
+            # Pass the token as a header for this command only, so it is never written into the mirror's config
+            credentials = base64.b64encode(f"x-access-token:{self.api_key}".encode()).decode()
+            command += ["-c", f"http.https://github.com/.extraheader=AUTHORIZATION: basic {credentials}"]
+        command += args
+        # GIT_ALLOW_PROTOCOL also stops redirects and alternates from switching to a transport that isn't allowed
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0", GIT_ALLOW_PROTOCOL=":".join(self.allowed_schemes))
+        try:
+            result = subprocess.run(command, cwd=cwd, env=env, capture_output=True, timeout=self.timeout)
+        except subprocess.TimeoutExpired as e:
+            raise GitMirrorError(f"git {args[0]} timed out after {self.timeout}s") from e
+        if result.returncode != 0:
+            raise GitMirrorError(f"git {args[0]} failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+        return result.stdout.decode("utf-8", "replace")
+
+    def _sync(self, repo_name, url):
+        # Checked here too, the watchlist may hold urls saved before the schemes were restricted
+        check_remote_url(url, self.allowed_schemes)
+        path = self.mirror_path(repo_name)
+        if not os.path.isdir(path):
+            self.logger.info(f"Creating mirror of {repo_name} at {path}")
+            os.makedirs(path)
+            try:
+                self.run_git(["init", "--bare", "--quiet"], cwd=path)
+                # "--" ends option parsing before the url, so a url starting with "-" can't be read as a git option
+                self.run_git(["remote", "add", "--", "origin", url], cwd=path)
+                # Only mirror branches, not pull request refs, to keep the mirror small
+                self.run_git(["config", "remote.origin.fetch", "+refs/heads/*:refs/heads/*"], cwd=path)
+                # Point HEAD at the remote's default branch so the history walk follows the same branch as the REST API
+                symref = self.run_git(["ls-remote", "--symref", "--", url, "HEAD"], cwd=path, url=url)
+                match = re.search(r"^ref: (refs/heads/\S+)\s+HEAD", symref, re.MULTILINE)
+                if match:
+                    self.run_git(["symbolic-ref", "HEAD", match.group(1)], cwd=path)
+            except GitMirrorError:
+                # Don't leave a half initialised mirror behind, the next check should start over
+                shutil.rmtree(path, ignore_errors=True)
+                raise
+        else:
+            self.run_git(["remote", "set-url", "--", "origin", url], cwd=path)
+        # Incremental: only objects the mirror doesn't have yet are transferred
+        self.run_git(["fetch", "--prune", "--quiet", "--", "origin"], cwd=path, url=url)
+
+    def _new_commits(self, repo_name, last_commit_sha, limit, html_base):
+        path = self.mirror_path(repo_name)
+        revisions = ["HEAD"]
+        gap_closed = True
+        if last_commit_sha:
+            try:
+                self.run_git(["cat-file", "-e", f"{last_commit_sha}^{{commit}}"], cwd=path)
+                revisions.append(f"^{last_commit_sha}")
+            except GitMirrorError:
+                # The last seen commit is gone, e.g. after a force push, so we can't tell exactly what is new
+                self.logger.warning(f"Last seen commit {last_commit_sha} is not in the mirror of {repo_name}")
+                gap_closed = False
+        else:
+            # A newly added repo only announces its latest commit
+            limit = 1
+        output = self.run_git(["log", f"--max-count={limit}", f"--format={LOG_FORMAT}", "--shortstat", *revisions], cwd=path)
+        commits = parse_log(output, html_base)
+        if gap_closed and last_commit_sha and len(commits) == limit:
+            count = int(self.run_git(["rev-list", "--count", *revisions], cwd=path).strip())
+            gap_closed = count == limit
+        return commits, gap_closed
+
+    async def fetch(self, repo_name, url):
+        """Creates the mirror if needed and fetches new objects, off the event loop"""
+        lock = self.locks.setdefault(repo_name.lower(), asyncio.Lock())
+        async with lock:
+            await asyncio.to_thread(self._sync, repo_name, url)
+
+    async def new_commits(self, repo_name, last_commit_sha, limit=500, html_base=None):
+        """Lists commits on the default branch after last_commit_sha, newest first
+        :return: A tuple of (commits, gap_closed) matching GitMonitor.fetch_commits
+        """
+        lock = self.locks.setdefault(repo_name.lower(), asyncio.Lock())
+        async with lock:
+            return await asyncio.to_thread(self._new_commits, repo_name, last_commit_sha, limit, html_base)
@@ -0,0 +1,92 @@
+# Per-channel outbound queue for GitMonitor notifications. Embeds are queued per channel, held for a short coalescing
+# window so commits from the same push end up together, and sent up to 10 embeds per message at a paced rate so a
+# large push does not trip Discord's per-channel rate limits.
+
+import asyncio
+import time
+
+import discord
+
+# Discord limits for a single message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARACTERS_PER_MESSAGE = 6000
+
+
+def pack_embeds(embeds):
+    """Takes as many embeds from the front of the list as fit in one Discord message
+    :param embeds: A list of discord.Embed objects, oldest first. Packed embeds are removed from the list.
+    :return: The list of embeds for the next message
+    """
+    batch = []
+    characters = 0
+    while embeds and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+        size = len(embeds[0])
+        # Always send at least one embed, even if it alone is over the character budget Discord will reject it loudly
+        if batch and characters + size > MAX_EMBED_CHARACTERS_PER_MESSAGE:
+            break
+        batch.append(embeds.pop(0))
+        characters += size
+    return batch
+
+
+class ChannelNotifier:
+    """Batches embeds into as few messages as possible and drains each channel at a rate-limit-aware pace"""
+
+    def __init__(self, logger, coalesce_delay=2.0, send_interval=1.5):
+        """
+        :param logger: The bot logger
+        :param coalesce_delay: Seconds to wait after the first queued embed so the rest of the push can join the batch
+        :param send_interval: Minimum seconds between messages to the same channel
+        """
+        self.logger = logger
+        self.coalesce_delay = coalesce_delay
+        self.send_interval = send_interval
+        self.queues = {}
+        self.channels = {}
+        self.drain_tasks = {}
+        self.last_sent = {}
+        self.closing = asyncio.Event()
+
+    def enqueue(self, channel, embed):
+        """Queues an embed for a channel and makes sure the channel is being drained"""
+        self.queues.setdefault(channel.id, []).append(embed)
+        self.channels[channel.id] = channel
+        task = self.drain_tasks.get(channel.id)
+        if task is None or task.done():
+            self.drain_tasks[channel.id] = asyncio.get_running_loop().create_task(self.drain(channel.id, self.coalesce_delay))
+
+    async def drain(self, channel_id, delay=0):
+        """Sends everything queued for a channel, packing embeds into as few messages as possible"""
+        if delay and not self.closing.is_set():
+            try:
+                await asyncio.wait_for(self.closing.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+        queue = self.queues.get(channel_id)
+        while queue:
+            wait = self.last_sent.get(channel_id, 0) + self.send_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            batch = pack_embeds(queue)
+            channel = self.channels[channel_id]
+            try:
+                await channel.send(embeds=batch)
+                self.logger.debug(f"Sent {len(batch)} notifications in one message to {channel}")
+            except discord.HTTPException as e:
+                retry_after = getattr(e, "retry_after", None)
+                if e.status == 429 and retry_after:
+                    # Put the batch back and wait out the rate limit before trying again
+                    queue[:0] = batch
+                    self.logger.warning(f"Rate limited sending to {channel}, retrying in {retry_after}s")
+                    await asyncio.sleep(retry_after)
+                    continue
+                self.logger.error(f"Error sending {len(batch)} notifications to {channel}: {e}")
+            except Exception as e:
+                self.logger.error(f"Error sending {len(batch)} notifications to {channel}: {e}")
+            self.last_sent[channel_id] = time.monotonic()
+
+    async def close(self):
+        """Sends anything still queued without waiting for the coalescing window and waits for the drains to finish"""
+        self.closing.set()
+        await asyncio.gather(*self.drain_tasks.values(), return_exceptions=True)
+        self.drain_tasks.clear()
@@ -0,0 +1,153 @@
+# GitHub webhook receiver for the GitMonitor cog. Runs a small aiohttp web server alongside the bot which accepts
+# signed GitHub `push` deliveries and hands the commits to GitMonitor, so notifications arrive seconds after a push
+# instead of waiting for the next poll.
+
+import asyncio
+import hashlib
+import hmac
+import json
+
+from aiohttp import web
+
+
+def sign_payload(secret, body):
+    """Computes the X-Hub-Signature-256 header value GitHub sends for a payload
+    :param secret: The webhook secret configured on the GitHub repository
+    :param body: The raw request body in bytes
+    :return: The signature string in the form sha256=<hexdigest>
+    """
+    digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(secret, body, signature_header):
+    """Verifies the HMAC-SHA256 signature of a webhook delivery in constant time
+    :param secret: The webhook secret configured on the GitHub repository
+    :param body: The raw request body in bytes
+    :param signature_header: The value of the X-Hub-Signature-256 header
+    :return: True if the signature matches the body, False otherwise
+    """
+    if not secret or not signature_header:
+        return False
+    return hmac.compare_digest(sign_payload(secret, body), signature_header)
+
+
+def parse_push_event(payload):
+    """Extracts the repository and commits from a GitHub push payload
+    Commits are converted to the shape returned by the REST List Commits endpoint and ordered newest first, so they
+    can go through the same notification path as polled commits. Only pushes to the default branch are returned,
+    matching what the poller sees.
+    :param payload: The decoded push event payload
+    :return: A tuple of (repo_name, commits) or None if the push has nothing to notify about
+    """
+    repository = payload.get("repository") or {}
+    repo_name = repository.get("full_name")
+    default_branch = repository.get("default_branch") or repository.get("master_branch")
+    if not repo_name or payload.get("deleted"):
+        return None
+    if default_branch and payload.get("ref") != f"refs/heads/{default_branch}":
+        return None
+
+    sender_avatar = (payload.get("sender") or {}).get("avatar_url")
+    commits = []
+    for push_commit in payload.get("commits") or []:
+        author = push_commit.get("author") or {}
+        username = author.get("username")
+        avatar_url = f"https://github.com/{username}.png" if username else sender_avatar
+        commits.append({
+            "sha": push_commit["id"],
+            "html_url": push_commit.get("url"),
+            "commit": {
+                "message": push_commit.get("message", ""),
+                "author": {
+                    "name": author.get("name"),
+                    "email": author.get("email"),
+                    "date": push_commit.get("timestamp"),
+                },
+            },
+            "author": {"login": username, "avatar_url": avatar_url},
+        })
+    if not commits:
+        return None
+    commits.reverse()
+    return repo_name, commits
+
+
+class GitHubWebhookServer:
+    """Embedded aiohttp server which receives GitHub webhook deliveries for GitMonitor"""
+
+    def __init__(self, secret, on_push, logger, host="0.0.0.0", port=8080, path="/github/webhook"):
+        """
+        :param secret: The webhook secret used to verify deliveries
+        :param on_push: Coroutine function called with (repo_name, commits) for every verified push
+        :param logger: The bot logger
+        :param host: The interface to listen on
+        :param port: The port to listen on
+        :param path: The URL path GitHub posts deliveries to
+        """
+        self.secret = secret
+        self.on_push = on_push
+        self.logger = logger
+        self.host = host
+        self.port = port
+        self.path = path
+        self.runner = None
+        self._tasks = set()
+
+    def make_app(self):
+        """Builds the aiohttp application serving the webhook route"""
+        app = web.Application(client_max_size=25 * 1024 * 1024)  # GitHub caps webhook payloads at 25 MB
+        app.router.add_post(self.path, self.handle_delivery)
+        return app
+
+    async def start(self):
+        """Starts listening for webhook deliveries"""
+        self.runner = web.AppRunner(self.make_app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.logger.info(f"GitMonitor webhook receiver listening on {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        """Stops the web server and waits for in-flight push handlers to finish"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+        self.logger.info("GitMonitor webhook receiver stopped.")
+
+    async def handle_delivery(self, request):
+        """Verifies and dispatches a single webhook delivery"""
+        body = await request.read()
+        if not verify_signature(self.secret, body, request.headers.get("X-Hub-Signature-256")):
+            self.logger.warning(f"Rejected webhook delivery with an invalid signature from {request.remote}")
+            return web.Response(status=401, text="invalid signature")
+
+        event = request.headers.get("X-GitHub-Event")
+        delivery = request.headers.get("X-GitHub-Delivery")
+        if event == "ping":
+            self.logger.info(f"Webhook ping received (delivery {delivery})")
+            return web.Response(text="pong")
+        if event != "push":
+            self.logger.debug(f"Ignoring webhook event {event} (delivery {delivery})")
+            return web.Response(status=202, text="ignored")
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self.logger.error(f"Webhook delivery {delivery} has an invalid JSON body")
+            return web.Response(status=400, text="invalid payload")
+
+        push = parse_push_event(payload)
+        if push is None:
+            self.logger.debug(f"Webhook push {delivery} has no commits on the default branch")
+            return web.Response(status=202, text="ignored")
+
+        # GitHub times out deliveries after 10 seconds, so acknowledge now and post the commits in the background
+        repo_name, commits = push
+        self.logger.info(f"Webhook push received for {repo_name} with {len(commits)} commits (delivery {delivery})")
+        task = asyncio.create_task(self.on_push(repo_name, commits))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.Response(status=202, text="accepted")
@@ -0,0 +1,79 @@
+import importlib.util
+import math
+from functools import lru_cache
+from io import BytesIO
+
+# Discord's attachment limit for servers without boosts
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def pillow_available():
+    """Whether Pillow is installed, so panels can be composited and report renders compared
+    Pillow is optional, the rest of the cog works without it. It is looked up here without being imported, and
+    imported by the functions using it, so loading the cog doesn't pay for it.
+    """
+    return importlib.util.find_spec("PIL") is not None
+
+
+def encode_image(image, image_format, quality=None):
+    """Encodes a Pillow image with the smallest lossless settings for the format, or lossy WebP when quality is given
+    :param image: The Pillow image
+    :param image_format: png or webp
+    :param quality: WebP quality for lossy encoding, lossless when None
+    :return: The encoded bytes
+    """
+    from PIL import Image
+
+    output = BytesIO()
+    if image_format == "webp":
+        if quality is None:
+            image.save(output, format="WEBP", lossless=True, method=6)
+        else:
+            image.save(output, format="WEBP", quality=quality, method=6)
+    else:
+        # Grafana panels use few colours, so an adaptive palette is visually lossless and far smaller than RGB
+        image.quantize(colors=256, method=Image.Quantize.FASTOCTREE).save(
+            output, format="PNG", optimize=True
+        )
+    return output.getvalue()
+
+
+def composite_grid(images, columns=None, image_format="webp", max_bytes=DEFAULT_MAX_BYTES, padding=8):
+    """Stitches rendered panels into a single grid image. CPU bound, so run it in a worker thread.
+    :param images: A list of encoded images (PNG bytes from the renderer) in display order
+    :param columns: The number of grid columns, roughly square when None
+    :param image_format: png or webp
+    :param max_bytes: The size the result must fit in. Larger results are re-encoded lossy and then downscaled.
+    :param padding: Pixels between panels
+    :return: A tuple of (encoded bytes, format), the format is webp if the image had to be re-encoded to fit
+    """
+    if not pillow_available():
+        raise RuntimeError("Pillow is required to composite panels")
+    from PIL import Image
+
+    panels = [Image.open(BytesIO(data)).convert("RGB") for data in images]
+    columns = columns or math.ceil(math.sqrt(len(panels)))
+    rows = math.ceil(len(panels) / columns)
+    cell_width = max(panel.width for panel in panels)
+    cell_height = max(panel.height for panel in panels)
+    # Grafana's dark theme background, so padding blends in with the panels
+    grid = Image.new(
+        "RGB",
+        (columns * cell_width + (columns - 1) * padding, rows * cell_height + (rows - 1) * padding),
+        (17, 18, 23),
+    )
+    for index, panel in enumerate(panels):
+        row, column = divmod(index, columns)
+        grid.paste(panel, (column * (cell_width + padding), row * (cell_height + padding)))
+
+    encoded = encode_image(grid, image_format)
+    if len(encoded) <= max_bytes:
+        return encoded, image_format
+    # Too large for Discord: fall back to lossy WebP, then shrink until it fits
+    quality = 90
+    while True:
+        encoded = encode_image(grid, "webp", quality)
+        if len(encoded) <= max_bytes or grid.width < 200:
+            return encoded, "webp"
+        grid = grid.resize((int(grid.width * 0.75), int(grid.height * 0.75)), Image.Resampling.LANCZOS)
@@ -0,0 +1,168 @@
+import asyncio
+from collections import namedtuple
+
+# A panel which can be rendered: the dashboard it lives on and its id within that dashboard
+PanelRef = namedtuple("PanelRef", ["dashboard_uid", "dashboard_slug", "panel_id", "title", "dashboard_title"])
+
+# The keys kept from each panel while a dashboard model is decoded, targets, field config and the rest are dropped
+PANEL_KEYS = ("id", "title", "type", "panels", "collapsed")
+
+
+def prune_panel(obj):
+    """json object_hook which strips panel objects down to PANEL_KEYS as they are decoded
+    Objects are decoded innermost first, so a panel's targets and field config are freed as soon as the panel itself
+    is decoded, instead of the whole model being held in memory at once. Panels are recognised by their gridPos.
+    """
+    if "gridPos" in obj:
+        return {key: obj[key] for key in PANEL_KEYS if key in obj}
+    return obj
+
+
+def extract_panels(dashboard_model):
+    """Lists the renderable panels of a dashboard model, iteratively and without descending into panel contents
+    Rows are skipped but the panels of collapsed rows, which Grafana nests inside the row, are included, as are the
+    rows of dashboards from before schema version 16.
+    :param dashboard_model: The dashboard JSON model
+    :return: A list of (title, panel id) tuples in dashboard order, titles may repeat
+    """
+    panels = []
+    pending = list(reversed(dashboard_model.get("panels", [])))
+    for legacy_row in reversed(dashboard_model.get("rows", [])):
+        pending.extend(reversed(legacy_row.get("panels", [])))
+    while pending:
+        panel = pending.pop()
+        if panel.get("type") == "row":
+            pending.extend(reversed(panel.get("panels", [])))
+            continue
+        if "id" not in panel:
+            continue
+        panels.append((panel.get("title") or f"Panel {panel['id']}", panel["id"]))
+    return panels
+
+
+def slug_from_url(url):
+    """Extracts the slug from a Grafana dashboard url of the form /d/{uid}/{slug}"""
+    parts = (url or "").strip("/").split("/")
+    return parts[2] if len(parts) >= 3 and parts[0] == "d" else None
+
+
+class DashboardIndex:
+    """Dashboards discovered from the Grafana API and the panels on each, refreshed only when a dashboard changes"""
+
+    def __init__(self, extract_panels, logger, concurrency=4):
+        """
+        :param extract_panels: Called with a dashboard model, returns a list of (panel title, panel id) tuples
+        :param logger: The bot logger
+        :param concurrency: How many dashboard requests run at once during a refresh
+        """
+        self.extract_panels = extract_panels
+        self.logger = logger
+        self.concurrency = concurrency
+        # uid -> {"title", "slug", "version", "panels": [(title, id)]}
+        self.dashboards = {}
+        # display name -> PanelRef, across every dashboard
+        self.panels = {}
+        # Incremented whenever the panel map changes, so dependent indexes know when to rebuild
+        self.generation = 0
+
+    def add_dashboard(self, uid, slug, model, version=None):
+        """Adds or replaces a dashboard from its JSON model and rebuilds the panel map
+        :param uid: The dashboard uid
+        :param slug: The dashboard slug used in render urls
+        :param model: The dashboard JSON model
+        :param version: The dashboard version, or None if unknown so the next refresh fetches it again
+        """
+        self.dashboards[uid] = {
+            "title": model.get("title", slug),
+            "slug": slug,
+            "version": version,
+            "panels": self.extract_panels(model),
+        }
+        self.rebuild_panels()
+
+    def rebuild_panels(self):
+        """Rebuilds the display name -> PanelRef map
+        Titles used more than once get the dashboard title appended, and the panel id as well if that is still ambiguous.
+        """
+        refs = [
+            PanelRef(uid, dashboard["slug"], panel_id, title, dashboard["title"])
+            for uid, dashboard in self.dashboards.items()
+            for title, panel_id in dashboard["panels"]
+        ]
+        title_counts = {}
+        dashboard_title_counts = {}
+        for ref in refs:
+            title_counts[ref.title] = title_counts.get(ref.title, 0) + 1
+            key = (ref.title, ref.dashboard_uid)
+            dashboard_title_counts[key] = dashboard_title_counts.get(key, 0) + 1
+        panels = {}
+        for ref in refs:
+            name = ref.title if title_counts[ref.title] == 1 else f"{ref.title} ({ref.dashboard_title})"
+            if dashboard_title_counts[(ref.title, ref.dashboard_uid)] > 1 or name in panels:
+                name = f"{name} #{ref.panel_id}"
+            panels[name] = ref
+        self.panels = panels
+        self.generation += 1
+
+    def dashboard_uid(self, name):
+        """Finds a dashboard uid from its slug, title or uid"""
+        for uid, dashboard in self.dashboards.items():
+            if name in (uid, dashboard["slug"], dashboard["title"]):
+                return uid
+        return None
+
+    async def refresh(self, fetch_json, tag=None):
+        """Discovers dashboards with /api/search and refetches the model of any whose version changed
+        :param fetch_json: Coroutine function called with (path, params, object_hook=None) returning decoded JSON from
+            the Grafana API
+        :param tag: Only index dashboards with this tag when set
+        :return: True if the panel map changed
+        """
+        params = {"type": "dash-db", "limit": 5000}
+        if tag:
+            params["tag"] = tag
+        search_results = await fetch_json("/api/search", params)
+        found = {result["uid"]: result for result in search_results if result.get("uid")}
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def refresh_dashboard(uid, result):
+            async with semaphore:
+                known = self.dashboards.get(uid)
+                if known and known["version"] is not None:
+                    # A one-row version listing is much cheaper than the full model, so check it first
+                    versions = await fetch_json(f"/api/dashboards/uid/{uid}/versions", {"limit": 1})
+                    if isinstance(versions, dict):
+                        versions = versions.get("versions", [])
+                    if versions and versions[0].get("version") == known["version"]:
+                        return None
+                response = await fetch_json(f"/api/dashboards/uid/{uid}", None, prune_panel)
+            model = response["dashboard"]
+            meta = response.get("meta", {})
+            slug = meta.get("slug") or slug_from_url(result.get("url")) or uid
+            return uid, slug, model
+
+        results = await asyncio.gather(
+            *(refresh_dashboard(uid, result) for uid, result in found.items()),
+            return_exceptions=True,
+        )
+        changed = False
+        for uid, result in zip(found, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to refresh Grafana dashboard {uid}: {result}")
+            elif result is not None:
+                uid, slug, model = result
+                self.dashboards[uid] = {
+                    "title": model.get("title", slug),
+                    "slug": slug,
+                    "version": model.get("version"),
+                    "panels": self.extract_panels(model),
+                }
+                self.logger.info(f"Indexed Grafana dashboard {slug} (version {model.get('version')})")
+                changed = True
+        for uid in set(self.dashboards) - set(found):
+            self.logger.info(f"Grafana dashboard {self.dashboards[uid]['slug']} is gone, removing it from the index")
+            del self.dashboards[uid]
+            changed = True
+        if changed:
+            self.rebuild_panels()
+        return changed
@@ -0,0 +1,121 @@
+import math
+
+# Unicode block characters from lowest to highest, used to draw text sparklines
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+def find_panel(dashboard_model, panel_id):
+    """Finds a panel in a dashboard model by id, including panels nested in collapsed rows
+    :param dashboard_model: The dashboard JSON model
+    :param panel_id: The panel id
+    :return: The panel dict, or None if it isn't on the dashboard
+    """
+    pending = list(dashboard_model.get("panels", []))
+    while pending:
+        panel = pending.pop()
+        if panel.get("id") == panel_id:
+            return panel
+        pending.extend(panel.get("panels", []))
+    return None
+
+
+def datasource_ref(datasource):
+    """Normalizes a datasource reference, old dashboards store the datasource name as a plain string"""
+    if isinstance(datasource, dict):
+        return datasource
+    if datasource:
+        return {"uid": datasource}
+    return None
+
+
+def build_query(panel, time_from="now-1h", time_to="now", max_data_points=100):
+    """Builds an /api/ds/query request body from a panel's targets
+    :param panel: The panel dict from the dashboard model
+    :param time_from: The start of the range, e.g. now-1h
+    :param time_to: The end of the range
+    :param max_data_points: Asks the datasource to downsample each series, which keeps the response small
+    :return: The request body, or None if the panel has no queries
+    """
+    panel_datasource = datasource_ref(panel.get("datasource"))
+    queries = []
+    for target in panel.get("targets", []):
+        if target.get("hide"):
+            continue
+        query = dict(target)
+        query["refId"] = target.get("refId", chr(ord("A") + len(queries)))
+        query["datasource"] = datasource_ref(target.get("datasource")) or panel_datasource
+        query["maxDataPoints"] = max_data_points
+        queries.append(query)
+    if not queries:
+        return None
+    return {"queries": queries, "from": time_from, "to": time_to}
+
+
+def series_name(field, ref_id):
+    """Picks a readable name for a data frame field"""
+    config = field.get("config") or {}
+    if config.get("displayNameFromDS"):
+        return config["displayNameFromDS"]
+    labels = field.get("labels") or {}
+    if labels:
+        return ", ".join(f"{key}={value}" for key, value in sorted(labels.items()))
+    return field.get("name") or ref_id
+
+
+def summarize_frames(response):
+    """Reduces the data frames returned by /api/ds/query to summary statistics per series
+    :param response: The decoded /api/ds/query response
+    :return: A tuple of (list of series dicts with name, last, min, max, avg, count and values, list of error messages)
+    """
+    series = []
+    errors = []
+    for ref_id, result in (response.get("results") or {}).items():
+        if result.get("error"):
+            errors.append(f"{ref_id}: {result['error']}")
+        for frame in result.get("frames") or []:
+            fields = frame.get("schema", {}).get("fields", [])
+            columns = frame.get("data", {}).get("values", [])
+            for field, column in zip(fields, columns):
+                if field.get("type") != "number":
+                    continue
+                values = [
+                    value for value in column
+                    if isinstance(value, (int, float)) and not math.isnan(value)
+                ]
+                if not values:
+                    continue
+                series.append({
+                    "name": series_name(field, ref_id),
+                    "last": values[-1],
+                    "min": min(values),
+                    "max": max(values),
+                    "avg": sum(values) / len(values),
+                    "count": len(values),
+                    "values": values,
+                })
+    return series, errors
+
+
+def sparkline(values, width=30):
+    """Draws values as a line of unicode block characters, averaging them into at most width buckets"""
+    if not values:
+        return ""
+    if len(values) > width:
+        bucket_size = len(values) / width
+        values = [
+            sum(bucket) / len(bucket)
+            for bucket in (
+                values[int(i * bucket_size) : max(int((i + 1) * bucket_size), int(i * bucket_size) + 1)]
+                for i in range(width)
+            )
+        ]
+    low, high = min(values), max(values)
+    spread = (high - low) or 1
+    return "".join(SPARK_BLOCKS[int((value - low) / spread * (len(SPARK_BLOCKS) - 1))] for value in values)
+
+
+def format_value(value):
+    """Formats a number compactly, without trailing zeros"""
+    if abs(value) >= 1000:
+        return f"{value:,.0f}"
+    return f"{value:.2f}".rstrip("0").rstrip(".")
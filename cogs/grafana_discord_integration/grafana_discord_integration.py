@@ -1,16 +1,40 @@
 import discord
-from dotenv import load_dotenv
 import asyncio
 from discord import app_commands
-from discord.ext import commands
-from discord.ui import View, Button
+from discord.ext import commands, tasks
 from json import JSONDecodeError
 from io import BytesIO
 import os
 import aiohttp
 import json
-from discord import Button, ButtonStyle, InteractionType
-from typing import List
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, Literal
+from atomic_file import write_atomic
+from settings import get_settings
+from .compositor import composite_grid, pillow_available
+from .dashboard_index import DashboardIndex, extract_panels, prune_panel
+from .datasource_query import build_query, find_panel, format_value, sparkline, summarize_frames
+from .panel_search import PanelSearchIndex
+from .panel_view import TIME_RANGES, GrafanaInteractiveView
+from .reports import (
+    CronError,
+    CronSchedule,
+    difference_hash,
+    hash_distance,
+    load_reports,
+)
+from .render_buffer import RenderByteBudget, SpooledRender, read_render
+from .render_queue import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_DASHBOARD,
+    PRIORITY_INTERACTIVE,
+    RenderQueue,
+    RenderQueueFull,
+    token_deadline,
+)
+from .render_cache import RenderCache, make_render_key, ttl_for_range
 
 # * Define the intents for the bot (this is required for the discord-py-slash-commands library))
 intents = discord.Intents.default()
@@ -20,8 +44,11 @@ intents.guilds = True
 intents.reactions = True
 intents.members = True
 
-# * Load the .env to get the discord and grafana tokens
-load_dotenv()
+# How long past the next warming cycle a warmed image stays cached, so it is still there while it is re-rendered
+WARM_TTL_MARGIN_SECONDS = 60
+
+# How many missed minutes the report loop checks when it falls behind
+REPORT_CATCH_UP_MINUTES = 10
 
 # section Code defining the Cog and its attributes/functions
 
@@ -31,26 +58,95 @@ class Grafana_Discord_Integration_Cog(commands.Cog):
         """Initializes the cog and sets up the Grafana API integration"""
         self.bot = bot
         self.logger = bot.logger
-        # todo dynamic dashboard names: If possible, get a list of the dashboard names from the grafana API
-        self.dashboard_names = [
-            "minecraft-deep-dive-dashboard",
-            "minecraft-server-stats",
-        ]
-        self.panels = {}
-        self.load_panel_config()
-        self.panel_source = os.getenv("GRAFANA_PANEL_SOURCE")
-        self.grafana_uid = os.getenv("GRAFANA_UID")
-        self.grafana_url = os.getenv("GRAFANA_URL")
+        self.settings = get_settings()
+        self.panel_source = self.settings.grafana_panel_source
+        self.grafana_uid = self.settings.grafana_uid
+        self.grafana_url = self.settings.grafana_url
+        # Dashboards and their panels are discovered from the Grafana API and refreshed when a dashboard's version changes
+        self.dashboard_index = DashboardIndex(extract_panels, self.logger)
+        self.dashboard_tag = self.settings.grafana_dashboard_tag
+        # Autocomplete index over panel names, rebuilt lazily when the dashboard index generation changes
+        self.panel_search = PanelSearchIndex()
         self.load_panel_config()
+        # Rendered images are cached by what they show, bounded by a total byte budget
+        self.render_cache = RenderCache(self.settings.grafana_render_cache_mb * 1024 * 1024)
+        # One pooled session for all Grafana requests. Renders go through a bounded priority queue whose worker count
+        # caps concurrent renders, so interactive requests overtake dashboards and background warming.
+        self.session = aiohttp.ClientSession()
+        self.render_queue = RenderQueue(
+            self.settings.grafana_render_concurrency,
+            self.settings.grafana_render_queue_size,
+            self.logger,
+        )
+        self.render_timeout_seconds = self.settings.grafana_render_timeout
+        self.dashboard_render_timeout_seconds = self.settings.grafana_dashboard_render_timeout
+        self.render_timeout = aiohttp.ClientTimeout(total=self.render_timeout_seconds)
+        # Render responses are streamed into memory within a global byte budget, anything larger is spooled to disk
+        self.render_budget = RenderByteBudget(int(self.settings.grafana_render_memory_mb * 1024 * 1024))
+        self.spool_threshold = int(self.settings.grafana_render_spool_mb * 1024 * 1024)
+        self.spool_dir = self.settings.grafana_render_spool_dir
+        # Render jobs queued or in progress, keyed like the render cache, so identical requests share one upstream render
+        self.inflight_renders = {}
+        # Background renders of the time ranges next to the one on display in an ipanel message
+        self.prefetch_tasks = set()
+        # (dashboard_uid, panel_id) -> (dashboard version, panel model), for data-only queries
+        self.panel_models = {}
+        # Request frequency per (panel, time range, size), decayed every warming cycle so stale favourites fade out
+        self.panel_requests = Counter()
+        self.last_user_render = 0.0
+        self.warm_renders = 0
+        self.warm_top_n = self.settings.grafana_warm_top_n
+        self.warm_quiet_seconds = self.settings.grafana_warm_quiet_seconds
+        self.warm_loop.change_interval(minutes=self.settings.grafana_warm_interval_minutes)
+        if self.warm_top_n > 0:
+            self.warm_loop.start()
+        self.dashboard_refresh_loop.change_interval(minutes=self.settings.grafana_dashboard_refresh_minutes)
+        self.dashboard_refresh_loop.start()
+        # Scheduled reports, posted only when the render has visibly changed since the last post
+        self.reports_file = self.settings.grafana_reports_file
+        try:
+            self.reports = load_reports(self.reports_file)
+        except (OSError, JSONDecodeError) as e:
+            self.logger.error(f"Could not read {self.reports_file}: {e}")
+            self.reports = []
+        self.report_hash_threshold = self.settings.grafana_report_hash_threshold
+        # The last minute the report loop has checked schedules for, and the running report tasks by report id
+        self.reports_checked_until = None
+        self.report_tasks = {}
+        self.report_save_lock = asyncio.Lock()
+        self.report_loop.start()
+
+    @property
+    def panels(self):
+        """Every known panel across all dashboards, keyed by display name"""
+        return self.dashboard_index.panels
+
+    @property
+    def dashboard_names(self):
+        """The slugs of every known dashboard"""
+        return [dashboard["slug"] for dashboard in self.dashboard_index.dashboards.values()]
+
+    async def cog_unload(self):
+        """Stops the background loops and closes the pooled HTTP session when the cog is unloaded"""
+        self.warm_loop.cancel()
+        self.dashboard_refresh_loop.cancel()
+        self.report_loop.cancel()
+        for task in self.prefetch_tasks:
+            task.cancel()
+        for task in self.report_tasks.values():
+            task.cancel()
+        await self.render_queue.close()
+        await self.session.close()
 
     async def panel_autocomplete(
         self, interaction: discord.Interaction, current: str
     ) -> List[app_commands.Choice[str]]:
-        print("autocomplete invoked")
+        """Suggests the best matching panels across every dashboard, ranked by prefix then fuzzy match"""
+        if self.panel_search.generation != self.dashboard_index.generation:
+            self.panel_search.build(self.panels, self.dashboard_index.generation)
         return [
-            app_commands.Choice(name=panel, value=panel)
-            for panel in self.panels
-            if current.lower() in panel.lower()
+            app_commands.Choice(name=panel[:100], value=panel)
+            for panel in self.panel_search.search(current)
         ]
 
     # discord - Integration setup command group for use with the discord-py-slash-commands library, this will group the setup related commands beneath /set.
@@ -70,7 +166,7 @@ class Grafana_Discord_Integration_Cog(commands.Cog):
         Set the Grafana panel source.
         Usage: /set panel_source [panel_source]
         """
-        os.environ["GRAFANA_PANEL_SOURCE"] = panel_source
+        self.settings.grafana_panel_source = panel_source
         self.panel_source = panel_source
         await Interaction.followup.send(f"Grafana panel source set to: {panel_source}")
 
@@ -82,7 +178,7 @@ class Grafana_Discord_Integration_Cog(commands.Cog):
         Set the Grafana UID.
         Usage: /set uid [grafana_uid]
         """
-        os.environ["GRAFANA_UID"] = grafana_uid
+        self.settings.grafana_uid = grafana_uid
         self.grafana_uid = grafana_uid
         await Interaction.followup.send(f"Grafana UID set to: {grafana_uid}")
 
@@ -92,122 +188,488 @@ class Grafana_Discord_Integration_Cog(commands.Cog):
         Set the Grafana URL.
         Usage: /set url [grafana_url]
         """
-        os.environ["GRAFANA_URL"] = grafana_url
+        self.settings.grafana_url = grafana_url
         self.grafana_url = grafana_url
+        self.render_cache.clear()
+        self.panel_models.clear()
+        self.dashboard_refresh_loop.restart()
         await Interaction.followup.send(f"Grafana URL set to: {grafana_url}")
 
-    # todo find a way to get the content of the json modal without requiring the user to download it
     def load_panel_config(self):
-        """Loads the panel names and ids from the json modal and stores them in a dictionary
+        """Seeds the dashboard index from a local json modal, if one exists, so panels are available before discovery runs
         :return: None
         """
-        jsonconfig_path = ".\grafana_dash_json_modal.json"
-        with open(jsonconfig_path, "r") as file:
-            json_modal = json.load(file)
-            self.extract_panel_config(json_modal, self.panels)
-            self.logger.info(f"Panel names and ids extracted from {jsonconfig_path}")
-
-    def extract_panel_config(self, jsonconfig, panels, parent_id=None):
-        """Recursively extracts the panel names and ids from the json modal and stores them in a dictionary
-        :param jsonconfig: The json modal to extract the panel names and ids from
-        :param panels: The dictionary to store the panel names and ids in
-        :param parent_id: The id of the parent panel
-        :return: None
+        jsonconfig_path = self.settings.grafana_dashboard_json
+        if not os.path.exists(jsonconfig_path):
+            return
+        try:
+            with open(jsonconfig_path, "r", encoding="utf-8") as file:
+                json_modal = json.load(file, object_hook=prune_panel)
+        except (OSError, JSONDecodeError) as e:
+            self.logger.error(f"Could not read {jsonconfig_path}: {e}")
+            return
+        self.dashboard_index.add_dashboard(
+            self.grafana_uid or json_modal.get("uid"), self.panel_source, json_modal
+        )
+        self.logger.info(f"Panel names and ids extracted from {jsonconfig_path}")
+
+    async def fetch_json(self, path, params=None, object_hook=None):
+        """Performs a GET against the Grafana HTTP API
+        :param path: The API path, e.g. /api/search
+        :param params: The query parameters
+        :param object_hook: Called on every decoded object, e.g. prune_panel. The body is then decoded in a worker
+            thread, since that is only used for large dashboard models.
+        :return: The decoded JSON response
+        """
+        api_key = self.settings.grafana_api_token
+        headers = {"Authorization": f"Bearer {api_key}", "Accept": "application/json"}
+        async with self.session.get(
+            f"https://{self.grafana_url}{path}", headers=headers, params=params
+        ) as api_response:
+            api_response.raise_for_status()
+            if object_hook is None:
+                return await api_response.json()
+            body = await api_response.read()
+        return await asyncio.to_thread(json.loads, body, object_hook=object_hook)
+
+    async def post_json(self, path, body):
+        """Performs a POST with a JSON body against the Grafana HTTP API
+        :param path: The API path, e.g. /api/ds/query
+        :param body: The JSON body
+        :return: The decoded JSON response
+        """
+        api_key = self.settings.grafana_api_token
+        headers = {"Authorization": f"Bearer {api_key}", "Accept": "application/json"}
+        async with self.session.post(
+            f"https://{self.grafana_url}{path}", headers=headers, json=body, timeout=self.render_timeout
+        ) as api_response:
+            # Grafana reports per query errors in the body alongside a 400 or 500 status, so only fail without one
+            if api_response.content_type != "application/json":
+                api_response.raise_for_status()
+            return await api_response.json()
+
+    async def panel_model(self, panel):
+        """Fetches a panel's JSON model, reusing it until the dashboard version changes
+        :param panel: The PanelRef
+        :return: The panel dict, or None if it is no longer on the dashboard
+        """
+        version = self.dashboard_index.dashboards.get(panel.dashboard_uid, {}).get("version")
+        cache_key = (panel.dashboard_uid, panel.panel_id)
+        cached = self.panel_models.get(cache_key)
+        if cached and version is not None and cached[0] == version:
+            return cached[1]
+        response = await self.fetch_json(f"/api/dashboards/uid/{panel.dashboard_uid}")
+        model = find_panel(response["dashboard"], panel.panel_id)
+        self.panel_models[cache_key] = (response["dashboard"].get("version"), model)
+        return model
+
+    async def query_panel(self, panel_name, time_from="now-1h", time_to="now"):
+        """Runs a panel's queries through /api/ds/query and summarizes the result, without the image renderer
+        :param panel_name: The name of the panel to query
+        :param time_from: The start of the time range
+        :param time_to: The end of the time range
+        :return: A tuple of (series summaries, error messages)
         """
-        if isinstance(jsonconfig, dict):
-            panel_id = jsonconfig.get("id", parent_id)
-            if "title" in jsonconfig and "id" in jsonconfig:
-                panels[jsonconfig["title"]] = jsonconfig["id"]
-            for key, value in jsonconfig.items():
-                self.extract_panel_config(value, panels, panel_id)
-        elif isinstance(jsonconfig, list):
-            for item in jsonconfig:
-                self.extract_panel_config(item, panels, parent_id)
+        panel = self.panels.get(panel_name)
+        if panel is None:
+            return [], ["unknown panel"]
+        model = await self.panel_model(panel)
+        body = build_query(model, time_from, time_to) if model else None
+        if body is None:
+            return [], ["the panel has no queries"]
+        self.logger.info(f"Querying panel data: {panel_name}")
+        response = await self.post_json("/api/ds/query", body)
+        return summarize_frames(response)
+
+    # section Dashboard discovery
+    @tasks.loop(minutes=10)
+    async def dashboard_refresh_loop(self):
+        """Discovers dashboards and re-indexes the panels of any dashboard whose version changed"""
+        try:
+            if await self.dashboard_index.refresh(self.fetch_json, self.dashboard_tag):
+                self.logger.info(
+                    f"Grafana index updated: {len(self.dashboard_index.dashboards)} dashboards, {len(self.panels)} panels"
+                )
+        except Exception as e:
+            self.logger.error(f"Error discovering Grafana dashboards: {e}")
 
     # section Helper functions for requesting the panel and dashboard images from the Grafana API render engine
-    async def fetch_rendered_panel(self, panel_name):
+    async def render_image(
+        self,
+        render_path,
+        params,
+        cache_key,
+        refresh=False,
+        priority=PRIORITY_INTERACTIVE,
+        deadline=None,
+        timeout=None,
+        min_ttl=0,
+    ):
+        """Fetches a rendered image from the Grafana render engine, serving it from the render cache when possible
+        :param render_path: The render API path, e.g. /render/d-solo/{uid}/{slug}
+        :param params: The query parameters for the render
+        :param cache_key: The render cache key describing the image
+        :param refresh: Skip the cache lookup and render again, used by the warming loop
+        :param priority: The render queue priority, one of the PRIORITY_ constants
+        :param deadline: time.monotonic() after which the result is useless, e.g. when the interaction token expires
+        :param timeout: Seconds the render may take once started, GRAFANA_RENDER_TIMEOUT when None
+        :param min_ttl: The shortest time in seconds the result stays cached, overriding a shorter ttl_for_range
+        :return: The PNG bytes or a SpooledRender for large images, or None if the render failed
+        """
+        if not refresh:
+            content = self.render_cache.get(cache_key)
+            if content is not None:
+                self.logger.info(f"Render cache hit: {render_path}")
+                return content
+        # Single flight: if the same image is already queued or rendering, wait for that job instead of starting another.
+        # The job is published before the first await, so a request arriving while it is being queued joins it too.
+        render_job = self.inflight_renders.get(cache_key)
+        if render_job is None:
+            render_job = self.render_queue.create_job(
+                lambda: self.render_upstream(render_path, params, cache_key, min_ttl),
+                priority,
+                timeout or self.render_timeout_seconds,
+                deadline,
+            )
+            self.inflight_renders[cache_key] = render_job
+            # Removes the job from the table however it ends, including being cancelled before it was queued
+            render_job.future.add_done_callback(
+                lambda future: self.forget_inflight_render(cache_key, render_job)
+            )
+            try:
+                await self.render_queue.push(render_job)
+            except BaseException:
+                render_job.cancel()
+                raise
+        else:
+            self.logger.info(f"Joining in-flight render: {render_path}")
+            await self.render_queue.promote(render_job, priority, deadline)
+        # The job is only cancelled once every requester waiting on it has given up
+        return await self.render_queue.wait(render_job)
+
+    def forget_inflight_render(self, cache_key, render_job):
+        """Done callback which removes a finished render job from the in-flight table"""
+        if self.inflight_renders.get(cache_key) is render_job:
+            del self.inflight_renders[cache_key]
+        # Retrieve the exception so a render nobody is waiting for anymore doesn't log an unretrieved exception
+        if not render_job.future.cancelled():
+            render_job.future.exception()
+
+    async def render_upstream(self, render_path, params, cache_key, min_ttl=0):
+        """Performs the render request against Grafana and caches the result
+        :param render_path: The render API path
+        :param params: The query parameters for the render
+        :param cache_key: The render cache key the result is stored under
+        :param min_ttl: The shortest time in seconds the result stays cached
+        :return: The PNG bytes or a SpooledRender for large images, or None if the render failed
+        """
+        api_key = self.settings.grafana_api_token
+        grafana_api_url = f"https://{self.grafana_url}{render_path}"
+        headers = {"Authorization": f"Bearer {api_key}", "Accept": "image/png"}
+        # The render queue enforces the per job timeout
+        async with self.session.get(
+            grafana_api_url, headers=headers, params=params, timeout=aiohttp.ClientTimeout(total=None)
+        ) as api_response:
+            if api_response.status == 200:
+                content = await read_render(
+                    api_response, self.render_budget, self.spool_threshold, self.spool_dir
+                )
+                if isinstance(content, SpooledRender):
+                    # Spooled renders are too large to be worth keeping in the in-memory cache
+                    self.logger.info(f"Render of {render_path} spooled to disk ({len(content)} bytes)")
+                else:
+                    ttl = max(min_ttl, ttl_for_range(params.get("from"), params.get("to", "now")))
+                    self.render_cache.put(cache_key, content, ttl)
+                return content
+            else:
+                self.logger.error(f"Failed to render {render_path}: {api_response.status}")
+
+    def render_file(self, content, filename):
+        """Wraps a render result in a discord.File without copying it
+        :param content: PNG bytes, or a SpooledRender which discord.py streams from disk when sending
+        :param filename: The attachment filename
+        :return: A discord.File
+        """
+        if isinstance(content, SpooledRender):
+            return discord.File(content.path, filename=filename)
+        # BytesIO shares the buffer of the bytes it is created from until it is written to
+        return discord.File(BytesIO(content), filename=filename)
+
+    async def fetch_rendered_panel(
+        self, panel_name, time_from=None, time_to="now", width=None, height=None, deadline=None
+    ):
         """Fetches the panel image from the Grafana API and sends it to the Discord channel
         :param panel_name: The name of the panel to fetch
+        :param time_from: The start of the time range, e.g. now-6h. The dashboard's saved range is used when None.
+        :param time_to: The end of the time range
+        :param width: The width of the panel image, Grafana's default when None
+        :param height: The height of the panel image, Grafana's default when None
+        :param deadline: When the requesting interaction expires, see token_deadline
         :return: A discord.File object containing the panel image
         """
-        panel_id = self.panels.get(panel_name)
-        if panel_id is not None:
-            api_key = os.getenv("GRAFANA_API_TOKEN")
-            panel_source = self.panel_source
-            grafana_url = self.grafana_url
-            grafana_uid = self.grafana_uid
-            grafana_api_url = f"https://{grafana_url}/render/d-solo/{grafana_uid}/{panel_source}?orgId=1&panelId={panel_id}"
-            headers = {"Authorization": f"Bearer {api_key}", "Accept": "image/png"}
-            async with aiohttp.ClientSession() as session:
-                self.logger.info(f"Fetching panel: {panel_name}")
-                async with session.get(
-                    grafana_api_url, headers=headers
-                ) as api_response:
-                    if api_response.status == 200:
-                        content = await api_response.read()
-                        image_stream = BytesIO(content)
-                        image_stream.seek(0)
-
-                        self.logger.info("Panel image prepared for Discord channel")
-                        return discord.File(image_stream, filename="rendered_panel.png")
-                    else:
-                        self.logger.error(
-                            f"Failed to fetch panel: {api_response.status}"
-                        )
-
-    async def fetch_rendered_multipanel(self, panel_names):
+        render_request = self.panel_render_request(panel_name, time_from, time_to, width, height)
+        if render_request is not None:
+            self.panel_requests[(panel_name, time_from, time_to, width, height)] += 1
+            self.last_user_render = time.monotonic()
+            self.logger.info(f"Fetching panel: {panel_name}")
+            content = await self.render_image(*render_request, deadline=deadline)
+            if content:
+                self.logger.info("Panel image prepared for Discord channel")
+                return self.render_file(content, "rendered_panel.png")
+
+    def panel_render_request(self, panel_name, time_from=None, time_to="now", width=None, height=None):
+        """Builds the render path, query parameters and cache key for a panel render
+        :return: A (render_path, params, cache_key) tuple, or None if the panel is unknown
+        """
+        panel = self.panels.get(panel_name)
+        if panel is None:
+            return None
+        params = {"orgId": 1, "panelId": panel.panel_id}
+        if time_from:
+            params.update({"from": time_from, "to": time_to})
+        if width and height:
+            params.update({"width": width, "height": height})
+        cache_key = make_render_key(
+            "panel",
+            (panel.dashboard_uid, panel.panel_id),
+            time_from,
+            time_to if time_from else None,
+            width,
+            height,
+        )
+        return f"/render/d-solo/{panel.dashboard_uid}/{panel.dashboard_slug}", params, cache_key
+
+    # section Background warming of the most requested panels
+    @tasks.loop(minutes=5)
+    async def warm_loop(self):
+        """Re-renders the most requested panels before their cached images expire, while nobody is waiting on the renderer"""
+        if time.monotonic() - self.last_user_render < self.warm_quiet_seconds or self.inflight_renders:
+            self.logger.debug("Grafana is busy, skipping the warming cycle")
+            return
+        warm_horizon = self.warm_loop.minutes * 60
+        # ttl_for_range gives short ranges 30-60 seconds, which would expire warmed images long before the next cycle.
+        # Warmed images are kept until just after the next cycle instead, where they are re-rendered since less than a
+        # cycle remains. Popular panels may therefore be up to one warming interval old, so lower
+        # GRAFANA_WARM_INTERVAL_MINUTES for fresher short range panels at the cost of more renders.
+        warm_ttl = warm_horizon + WARM_TTL_MARGIN_SECONDS
+        for (panel_name, time_from, time_to, width, height), _ in self.panel_requests.most_common(self.warm_top_n):
+            render_request = self.panel_render_request(panel_name, time_from, time_to, width, height)
+            # Stop as soon as somebody else needs the renderer, and skip images that will still be fresh next cycle
+            if render_request is None or self.render_cache.ttl_remaining(render_request[2]) > warm_horizon:
+                continue
+            if time.monotonic() - self.last_user_render < self.warm_quiet_seconds:
+                break
+            try:
+                if await self.render_image(
+                    *render_request, refresh=True, priority=PRIORITY_BACKGROUND, min_ttl=warm_ttl
+                ):
+                    self.warm_renders += 1
+                    self.logger.debug(f"Warmed panel {panel_name} ({time_from or 'default'} range)")
+            except Exception as e:
+                self.logger.error(f"Error warming panel {panel_name}: {e}")
+        # Halve every count each cycle so the ranking follows recent demand
+        for request_key in list(self.panel_requests):
+            self.panel_requests[request_key] /= 2
+            if self.panel_requests[request_key] < 0.1:
+                del self.panel_requests[request_key]
+
+    @warm_loop.before_loop
+    async def before_warm_loop(self):
+        await self.bot.wait_until_ready()
+
+    async def fetch_rendered_multipanel(self, panel_names, deadline=None):
         """Performs the same API request as fetch_rendered_panel but for multiple panels, seperated by commas in panel_names interacton
+        The panels are rendered concurrently, up to the render concurrency limit, and each has its own timeout.
         :param panel_names: A list of panel names to fetch
-        :return: A list of discord.File objects containing the panel images
+        :param deadline: When the requesting interaction expires, see token_deadline
+        :return: A list of (panel_name, discord.File or None, error or None) tuples in the order requested
         """
-        panel_files = []
-        for panel_name in panel_names:
-            # Strip the panel names for looping the panel request
-            panel_file = await self.fetch_rendered_panel(panel_name.strip())
-            if panel_file:
-                # Add the panel file to the list penel_files
-                panel_files.append(panel_file)
-        return panel_files
+
+        async def render_one(panel_name):
+            if panel_name not in self.panels:
+                return panel_name, None, "unknown panel"
+            try:
+                panel_file = await self.fetch_rendered_panel(panel_name, deadline=deadline)
+            except asyncio.TimeoutError:
+                self.logger.error(f"Timed out rendering panel: {panel_name}")
+                return panel_name, None, "timed out"
+            except RenderQueueFull:
+                return panel_name, None, "renderer busy"
+            except Exception as e:
+                self.logger.error(f"Error rendering panel {panel_name}: {e}")
+                return panel_name, None, "render error"
+            if panel_file is None:
+                return panel_name, None, "render failed"
+            return panel_name, panel_file, None
+
+        # Strip the panel names for the panel requests, gather keeps the results in request order
+        return await asyncio.gather(
+            *(render_one(panel_name.strip()) for panel_name in panel_names)
+        )
 
     async def dashboard_autocomplete(
         self, interaction: discord.Interaction, current: str
     ):
         """Provides autocomplete suggestions for dashboard names"""
-        dashboards = await self.dashboard_names()
+        current = current.lower()
         return [
-            dashboard
-            for dashboard in dashboards
-            if current.lower() in dashboard.lower()
-        ]
+            app_commands.Choice(name=dashboard["title"][:100], value=dashboard["slug"])
+            for dashboard in self.dashboard_index.dashboards.values()
+            if current in dashboard["slug"].lower() or current in dashboard["title"].lower()
+        ][:25]  # Discord shows at most 25 choices
 
     async def fetch_rendered_dashboard(
-        self, dashboard_name: str, width: int, height: int
+        self, dashboard_name: str, width: int, height: int, deadline=None
     ):
         """Fetches the dashboard image from the Grafana API and sends it to the Discord channel
         :param dashboard_name: The name of the dashboard to fetch
         :param width: The width of the dashboard image
         :param height: The height of the dashboard image
+        :param deadline: When the requesting interaction expires, see token_deadline
         :return: A discord.File object containing the dashboard image
         """
-        api_key = os.getenv("GRAFANA_API_TOKEN")
-        grafana_url = self.grafana_url
-        grafana_uid = self.grafana_uid
-        grafana_api_url = f"https://{grafana_url}/render/d/{grafana_uid}/{dashboard_name}?orgId=1&width={width}&height={height}&kiosk=tv&from=now-1h&to=now&var-machine=&var-ideal=12"
-        headers = {"Authorization": f"Bearer {api_key}", "Accept": "image/png"}
-        # Send the request to the Grafana API and stream the content to a BytesIO object which we can pass to discord as a file.
-        async with aiohttp.ClientSession() as session:
-            async with session.get(grafana_api_url, headers=headers) as api_response:
-                self.logger.info(f"Fetching dashboard: {dashboard_name}")
-                if api_response.status == 200:
-                    content = await api_response.read()
-                    image_stream = BytesIO(content)
-                    image_stream.seek(0)
-                    self.logger.info("Dashboard image prepared for Discord channel")
-                    return discord.File(image_stream, filename="rendered_dashboard.png")
-                else:
-                    self.logger.error(
-                        f"Failed to fetch dashboard: {api_response.status}"
-                    )
+        self.logger.info(f"Fetching dashboard: {dashboard_name}")
+        # Full dashboards are slow to render, so they queue behind single panels and get a longer timeout
+        content = await self.render_image(
+            *self.dashboard_render_request(dashboard_name, width, height),
+            priority=PRIORITY_DASHBOARD,
+            deadline=deadline,
+            timeout=self.dashboard_render_timeout_seconds,
+        )
+        if content:
+            self.logger.info("Dashboard image prepared for Discord channel")
+            return self.render_file(content, "rendered_dashboard.png")
+
+    # section Scheduled reports
+    @tasks.loop(seconds=30)
+    async def report_loop(self):
+        """Starts every report whose cron schedule matches a minute (UTC) since the last check
+        Every minute since the previous tick is checked, so a tick delayed past a minute boundary doesn't skip the
+        reports due in it. Reports run as tasks, so a slow render never holds up the loop.
+        """
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        if self.reports_checked_until is None:
+            self.reports_checked_until = now - timedelta(minutes=1)
+        # Cap the catch up, e.g. after the host was suspended, rather than posting hours of reports at once
+        minute = max(self.reports_checked_until, now - timedelta(minutes=REPORT_CATCH_UP_MINUTES))
+        while minute < now:
+            minute += timedelta(minutes=1)
+            for report in self.reports:
+                try:
+                    if CronSchedule(report["schedule"]).matches(minute):
+                        self.start_report(report, minute)
+                except CronError as e:
+                    self.logger.error(f"Report {report['id']} has an invalid schedule: {e}")
+        self.reports_checked_until = now
+
+    def start_report(self, report, minute):
+        """Starts a report run in the background, unless its previous run is still going"""
+        running = self.report_tasks.get(report["id"])
+        if running is not None and not running.done():
+            self.logger.warning(f"Report {report['id']} is still running from an earlier minute, skipping {minute:%H:%M}")
+            return
+        report["last_run"] = minute.strftime("%Y-%m-%dT%H:%M")
+        task = asyncio.create_task(self.run_report_task(report))
+        self.report_tasks[report["id"]] = task
+        task.add_done_callback(
+            lambda done: self.report_tasks.pop(report["id"]) if self.report_tasks.get(report["id"]) is done else None
+        )
+
+    async def run_report_task(self, report):
+        try:
+            await self.run_report(report)
+        except Exception as e:
+            self.logger.error(f"Report {report['id']} failed: {e}")
+        await self.save_report_config()
+
+    @report_loop.before_loop
+    async def before_report_loop(self):
+        await self.bot.wait_until_ready()
+
+    async def run_report(self, report):
+        """Renders a report through the render cache and posts it, unless it looks the same as the last one posted
+        :param report: The report entry from self.reports
+        :return: True if the report was posted
+        """
+        if report["kind"] == "dashboard":
+            render_request = self.dashboard_render_request(report["target"], 1800, 1200, report["time_from"])
+        else:
+            render_request = self.panel_render_request(report["target"], report["time_from"])
+        if render_request is None:
+            self.logger.error(f"Report {report['id']}: unknown panel {report['target']}")
+            return False
+        try:
+            content = await self.render_image(
+                *render_request,
+                priority=PRIORITY_DASHBOARD,
+                timeout=self.dashboard_render_timeout_seconds,
+            )
+        except Exception as e:
+            self.logger.error(f"Report {report['id']}: error rendering {report['target']}: {e}")
+            return False
+        if not content:
+            return False
+        image_hash = None
+        if pillow_available():
+            image = content.path if isinstance(content, SpooledRender) else content
+            image_hash = await asyncio.to_thread(difference_hash, image)
+            last_hash = report.get("last_hash")
+            if last_hash is not None and hash_distance(image_hash, int(last_hash, 16)) <= self.report_hash_threshold:
+                self.logger.info(f"Report {report['id']}: {report['target']} is unchanged, not posting")
+                report["skipped"] = report.get("skipped", 0) + 1
+                return False
+        channel = self.bot.get_channel(report["channel_id"])
+        if channel is None:
+            self.logger.error(f"Report {report['id']}: channel {report['channel_id']} not found")
+            return False
+        await channel.send(
+            content=f"Scheduled report: {report['target']} ({report['time_from']} to now)",
+            file=self.render_file(content, f"report_{report['id']}.png"),
+        )
+        if image_hash is not None:
+            report["last_hash"] = f"{image_hash:016x}"
+        report["posted"] = report.get("posted", 0) + 1
+        self.logger.info(f"Report {report['id']}: {report['target']} posted to {channel}")
+        return True
+
+    async def save_report_config(self):
+        """Writes the report schedules and their last posted hashes to disk in a worker thread"""
+        async with self.report_save_lock:
+            # Serialised on the event loop, so the snapshot is consistent while the file is written
+            text = json.dumps(self.reports, indent=4)
+            try:
+                await asyncio.to_thread(write_atomic, self.reports_file, text)
+            except OSError as e:
+                self.logger.error(f"Could not save {self.reports_file}: {e}")
+
+    def dashboard_render_request(self, dashboard_name, width, height, time_from="now-1h"):
+        """Builds the render path, query parameters and cache key for a dashboard render
+        :return: A (render_path, params, cache_key) tuple
+        """
+        variables = {"var-machine": "", "var-ideal": "12"}
+        params = {
+            "orgId": 1,
+            "width": width,
+            "height": height,
+            "kiosk": "tv",
+            "from": time_from,
+            "to": "now",
+            **variables,
+        }
+        # Dashboards are chosen by slug, fall back to the configured uid for dashboards discovery hasn't seen
+        dashboard_uid = self.dashboard_index.dashboard_uid(dashboard_name) or self.grafana_uid
+        dashboard = self.dashboard_index.dashboards.get(dashboard_uid)
+        dashboard_slug = dashboard["slug"] if dashboard else dashboard_name
+        cache_key = make_render_key(
+            "dashboard",
+            (dashboard_uid, dashboard_slug),
+            params["from"],
+            params["to"],
+            width,
+            height,
+            variables,
+        )
+        return f"/render/d/{dashboard_uid}/{dashboard_slug}", params, cache_key
 
     # section Start of Discord bot commands. This command structure is based on the discord-py-slash-commands library
 
@@ -222,6 +684,7 @@ class Grafana_Discord_Integration_Cog(commands.Cog):
     )
 
     @grafana.command(name="dashboard", description="Display a Grafana dashboard")
+    @app_commands.autocomplete(dashboard_name=dashboard_autocomplete)
     async def grafana_dashboard(
         self,
         Interaction: discord.Interaction,
@@ -238,7 +701,7 @@ class Grafana_Discord_Integration_Cog(commands.Cog):
         await Interaction.response.defer()
         try:
             dashboard_data = await self.fetch_rendered_dashboard(
-                dashboard_name, width, height
+                dashboard_name, width, height, token_deadline(Interaction.created_at)
             )
             if dashboard_data:
                 await Interaction.followup.send(file=dashboard_data)
@@ -249,12 +712,59 @@ class Grafana_Discord_Integration_Cog(commands.Cog):
                 await Interaction.followup.send(
                     "Failed to fetch the dashboard. Please check the dashboard name and try again."
                 )
+        except RenderQueueFull:
+            await Interaction.followup.send("The renderer is busy, please try again shortly.")
         except Exception as e:
             await Interaction.followup.send(
                 "An error occurred while fetching the dashboard."
             )
             self.logger.error(f"Error fetching dashboard: {e}")
 
+    @grafana.command(name="stats", description="Show Grafana render cache statistics")
+    async def grafana_stats(self, Interaction: discord.Interaction):
+        """Show Grafana render cache statistics
+        Usage: /grafana stats
+        """
+        cache = self.render_cache
+        lookups = cache.hits + cache.misses
+        hit_rate = f"{cache.hits / lookups:.0%}" if lookups else "n/a"
+        embed = discord.Embed(title="Grafana - Render Cache", color=discord.Color.blue())
+        embed.add_field(name="Hits", value=cache.hits, inline=True)
+        embed.add_field(name="Misses", value=cache.misses, inline=True)
+        embed.add_field(name="Hit rate", value=hit_rate, inline=True)
+        embed.add_field(name="Cached images", value=len(cache.entries), inline=True)
+        embed.add_field(
+            name="Cache size",
+            value=f"{cache.total_bytes / 1048576:.1f} / {cache.max_bytes / 1048576:.0f} MB",
+            inline=True,
+        )
+        embed.add_field(name="Evictions", value=cache.evictions, inline=True)
+        embed.add_field(name="Warm renders", value=self.warm_renders, inline=True)
+        embed.add_field(
+            name="Render memory",
+            value=f"{self.render_budget.in_use / 1048576:.1f} MB now, {self.render_budget.peak / 1048576:.1f} MB peak",
+            inline=True,
+        )
+        embed.add_field(name="Spooled to disk", value=self.render_budget.spills, inline=True)
+        queue = self.render_queue
+        embed.add_field(
+            name="Render queue",
+            value=f"{queue.running} running, {len(queue.pending)} waiting",
+            inline=True,
+        )
+        embed.add_field(
+            name="Dropped renders",
+            value=f"{queue.expired} expired, {queue.abandoned} abandoned, {queue.shed} shed",
+            inline=True,
+        )
+        popular = [
+            f"{panel_name} ({time_from or 'default'})"
+            for (panel_name, time_from, _, _, _), _ in self.panel_requests.most_common(self.warm_top_n)
+        ]
+        embed.add_field(name="Most requested", value="\n".join(popular) or "None yet", inline=False)
+        await Interaction.response.send_message(embed=embed)
+        self.logger.info(f"Render cache stats sent to {Interaction.user.name}")
+
     # Fetches the panel image from the Grafana API and sends it to the Discord channel
     @grafana.command(name="panel", description="Display a Grafana panel")
     @app_commands.autocomplete(panel_name=panel_autocomplete)
@@ -270,7 +780,9 @@ class Grafana_Discord_Integration_Cog(commands.Cog):
         print("Interaction response deferred")  # Debug print
         try:
             print(f"Fetching panel: {panel_name}")  # Debug print
-            panel_data = await self.fetch_rendered_panel(panel_name)
+            panel_data = await self.fetch_rendered_panel(
+                panel_name, deadline=token_deadline(interaction.created_at)
+            )
             if panel_data:
                 print(f"Panel data fetched for {panel_name}")  # Debug print
                 await interaction.followup.send(file=panel_data)
@@ -278,6 +790,8 @@ class Grafana_Discord_Integration_Cog(commands.Cog):
             else:
                 print("Failed to fetch panel data")  # Debug print
                 await interaction.followup.send("Failed to fetch the panel.")
+        except RenderQueueFull:
+            await interaction.followup.send("The renderer is busy, please try again shortly.")
         except Exception as e:
             self.logger.error(f"Error fetching panel: {e}")
             print(f"Exception occurred: {e}")  # Debug print
@@ -285,22 +799,92 @@ class Grafana_Discord_Integration_Cog(commands.Cog):
                 "An error occurred while fetching the panel."
             )
 
+    @grafana.command(name="value", description="Show the current value of a Grafana panel without rendering it")
+    @app_commands.autocomplete(panel_name=panel_autocomplete)
+    async def grafana_value(
+        self,
+        interaction: discord.Interaction,
+        panel_name: str,
+        time_from: str = "now-1h",
+        show_sparkline: bool = True,
+    ):
+        """Show the last, min, max and average of each series of a Grafana panel
+        Usage: /grafana value [panel_name] [time_from] [show_sparkline]
+        """
+        await interaction.response.defer()
+        try:
+            series, errors = await self.query_panel(panel_name, time_from)
+        except Exception as e:
+            self.logger.error(f"Error querying panel {panel_name}: {e}")
+            await interaction.followup.send("An error occurred while querying the panel.")
+            return
+        if not series:
+            await interaction.followup.send(
+                f"No data for {panel_name}" + (f": {'; '.join(errors)}" if errors else ".")
+            )
+            return
+        embed = discord.Embed(
+            title=panel_name[:256], description=f"{time_from} to now", color=discord.Color.blue()
+        )
+        # Discord allows 25 fields per embed
+        for entry in series[:25]:
+            value = (
+                f"**{format_value(entry['last'])}** (min {format_value(entry['min'])}, "
+                f"max {format_value(entry['max'])}, avg {format_value(entry['avg'])})"
+            )
+            if show_sparkline and entry["count"] > 1:
+                value += f"\n`{sparkline(entry['values'])}`"
+            embed.add_field(name=entry["name"][:256], value=value, inline=False)
+        footer = [f"{len(series) - 25} more series not shown"] if len(series) > 25 else []
+        embed.set_footer(text="; ".join(footer + errors)[:2048] or None)
+        await interaction.followup.send(embed=embed)
+        self.logger.info(f"Panel values for {panel_name} sent to {interaction.user.name}")
+
     # Same as the panel command, but will iterate through a list of panels seperated by commas in the panel_names interaction
     @grafana.command(name="multipanel", description="Display multiple Grafana panels")
     async def grafana_multipanel(
-        self, interaction: discord.Interaction, panel_names: str
+        self,
+        interaction: discord.Interaction,
+        panel_names: str,
+        composite: bool = False,
+        image_format: Literal["webp", "png"] = "webp",
     ):
         """Display multiple Grafana panels
-        Usage: /grafana multipanel [panel_names]
+        Usage: /grafana multipanel [panel_names] [composite] [image_format]
         """
         await interaction.response.defer()
         panel_list = [
             name.strip() for name in panel_names.split(",")
         ]  # Split and strip names
-        panel_files = await self.fetch_rendered_multipanel(panel_list)
+        results = await self.fetch_rendered_multipanel(
+            panel_list, token_deadline(interaction.created_at)
+        )
+        panel_files = [panel_file for _, panel_file, _ in results if panel_file]
+        failures = [f"{panel_name} ({error})" for panel_name, _, error in results if error]
+        failure_message = (
+            f"Could not render: {', '.join(failures)}" if failures else None
+        )
+        if composite and len(panel_files) > 1:
+            if not pillow_available():
+                failure_message = "\n".join(
+                    filter(None, [failure_message, "Compositing is unavailable (Pillow is not installed), sending separate panels."])
+                )
+            else:
+                try:
+                    panel_files = [await self.composite_panel_files(panel_files, image_format)]
+                except Exception as e:
+                    self.logger.error(f"Error compositing panels: {e}")
+                    failure_message = "\n".join(
+                        filter(None, [failure_message, f"Could not composite the panels ({e}), sending separate panels."])
+                    )
         if panel_files:
             try:
-                await interaction.followup.send(files=panel_files)
+                # Discord allows 10 attachments per message
+                for start in range(0, len(panel_files), 10):
+                    await interaction.followup.send(
+                        content=failure_message if start == 0 else None,
+                        files=panel_files[start : start + 10],
+                    )
             except Exception as e:
                 self.logger.error(f"Error sending panel files: {e}")
                 await interaction.followup.send(
@@ -308,42 +892,92 @@ class Grafana_Discord_Integration_Cog(commands.Cog):
                 )
         else:
             await interaction.followup.send(
-                "No panels were found or an error occurred."
+                failure_message or "No panels were found or an error occurred."
             )
 
+    async def composite_panel_files(self, panel_files, image_format):
+        """Stitches rendered panel files into one grid image in a worker thread
+        :param panel_files: The discord.File objects returned by fetch_rendered_multipanel
+        :param image_format: webp or png
+        :return: A single discord.File containing the grid
+        """
+        images = []
+        for panel_file in panel_files:
+            images.append(panel_file.fp.read())
+            # Rewind, so the separate panels can still be sent if compositing fails
+            panel_file.reset()
+        # Pillow releases the GIL while decoding and encoding, so a thread keeps the event loop responsive
+        content, image_format = await asyncio.to_thread(
+            composite_grid,
+            images,
+            image_format=image_format,
+            max_bytes=int(self.settings.grafana_attachment_limit_mb * 1024 * 1024),
+        )
+        self.logger.info(
+            f"Composited {len(images)} panels into one {image_format} image of {len(content)} bytes"
+        )
+        return discord.File(BytesIO(content), filename=f"rendered_panels.{image_format}")
+
     # section: Interactive commands using Discord components
 
     @grafana.command(
         name="ipanel", description="Copy a Grafana panel with time range buttons"
     )
-    async def grafana_ipanel(self, interaction: discord.Interaction, panel_name: str):
+    @app_commands.autocomplete(panel_name=panel_autocomplete)
+    async def grafana_ipanel(
+        self,
+        interaction: discord.Interaction,
+        panel_name: str,
+        time_range: Literal["1h", "6h", "12h", "24h", "7d", "30d"] = "1h",
+    ):
         """Render a Grafana Panel with time range buttons
-        Usage: /grafana ipanel [panel_name]
+        Usage: /grafana ipanel [panel_name] [time_range]
         """
         await interaction.response.defer()
-
-        view = GrafanaInteractiveView(self, panel_name)
-        buttons = [
-            Button(style=ButtonStyle.blue, label="1h", custom_id="1h"),
-            Button(style=ButtonStyle.blue, label="6h", custom_id="6h"),
-            Button(style=ButtonStyle.blue, label="12h", custom_id="12h"),
-            Button(style=ButtonStyle.blue, label="24h", custom_id="24h"),
-            Button(style=ButtonStyle.blue, label="7d", custom_id="7d"),
-            Button(style=ButtonStyle.blue, label="30d", custom_id="30d"),
-        ]
+        try:
+            panel_file = await self.fetch_rendered_panel(
+                panel_name, f"now-{time_range}", deadline=token_deadline(interaction.created_at)
+            )
+        except Exception as e:
+            self.logger.error(f"Error fetching panel: {e}")
+            panel_file = None
+        if panel_file is None:
+            await interaction.followup.send("Failed to fetch the panel.")
+            return
+        view = GrafanaInteractiveView(self, panel_name, time_range)
+        view.interaction = interaction
         await interaction.followup.send(
-            "Choose the panel time scope:", view=view, components=[buttons]
+            f"{panel_name}, last {time_range}", file=panel_file, view=view
         )
+        self.logger.info(f"Interactive panel {panel_name} sent to {interaction.user.name}")
+        self.prefetch_adjacent_ranges(panel_name, time_range)
 
-    @commands.Cog.listener()
-    async def on_button_click(interaction):
-        if interaction.component.custom_id in ["1h", "6h", "12h", "24h", "7d", "30d"]:
-            await interaction.respond(
-                type=InteractionType.UpdateMessage,
-                content=f"You selected {interaction.component.label} time range.",
-                components=[],
-            )
-            # TODO: Implement logic to fetch and send the panel image with the selected time range
+    def prefetch_adjacent_ranges(self, panel_name, time_range):
+        """Renders the ranges either side of the one on display into the cache, so the next button press is instant
+        :param panel_name: The panel on display
+        :param time_range: The range on display, one of TIME_RANGES
+        """
+        index = TIME_RANGES.index(time_range)
+        for neighbour in TIME_RANGES[max(0, index - 1) : index + 2]:
+            if neighbour == time_range:
+                continue
+            render_request = self.panel_render_request(panel_name, f"now-{neighbour}")
+            # Skip ranges that are already cached or being rendered
+            if render_request is None or self.render_cache.ttl_remaining(render_request[2]) > 0:
+                continue
+            if render_request[2] in self.inflight_renders:
+                continue
+            task = asyncio.create_task(self.prefetch_render(panel_name, neighbour, render_request))
+            self.prefetch_tasks.add(task)
+            task.add_done_callback(self.prefetch_tasks.discard)
+
+    async def prefetch_render(self, panel_name, time_range, render_request):
+        """Renders one prefetched range, logging rather than raising since nobody is waiting on it"""
+        try:
+            await self.render_image(*render_request, priority=PRIORITY_BACKGROUND)
+            self.logger.debug(f"Prefetched panel {panel_name} ({time_range})")
+        except Exception as e:
+            self.logger.error(f"Error prefetching panel {panel_name} ({time_range}): {e}")
 
     #! Needs work
     # todo: improve the display of the panels, maybe use a select menu
@@ -374,6 +1008,99 @@ class Grafana_Discord_Integration_Cog(commands.Cog):
         self.logger.info(f"Panel list sent to {Interaction.user.name}")
 
 
+    # discord - report command group, the commands beneath /grafanareport manage scheduled reports
+    grafanareport = app_commands.Group(
+        name="grafanareport",
+        description="Schedule Grafana panels and dashboards to be posted to a channel.",
+    )
+
+    async def report_target_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> List[app_commands.Choice[str]]:
+        """Suggests dashboards or panels depending on the kind chosen"""
+        if interaction.namespace.kind == "dashboard":
+            return await self.dashboard_autocomplete(interaction, current)
+        return await self.panel_autocomplete(interaction, current)
+
+    @grafanareport.command(name="add", description="Post a panel or dashboard to a channel on a cron schedule")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    @app_commands.autocomplete(target=report_target_autocomplete)
+    async def grafanareport_add(
+        self,
+        interaction: discord.Interaction,
+        kind: Literal["panel", "dashboard"],
+        target: str,
+        schedule: str,
+        channel: discord.TextChannel,
+        time_from: str = "now-24h",
+    ):
+        """Schedule a report
+        Usage: /grafanareport add [kind] [target] [schedule] [channel] [time_from]
+        The schedule is a five field cron expression in UTC, e.g. 0 8 * * 1-5 for 08:00 on weekdays.
+        """
+        try:
+            next_run = CronSchedule(schedule).next_after(datetime.now(timezone.utc))
+        except CronError as e:
+            await interaction.response.send_message(str(e), ephemeral=True)
+            return
+        if kind == "panel" and target not in self.panels:
+            await interaction.response.send_message(f"Unknown panel: {target}", ephemeral=True)
+            return
+        report = {
+            "id": max((report["id"] for report in self.reports), default=0) + 1,
+            "guild_id": interaction.guild_id,
+            "channel_id": channel.id,
+            "kind": kind,
+            "target": target,
+            "schedule": schedule,
+            "time_from": time_from,
+        }
+        self.reports.append(report)
+        await self.save_report_config()
+        await interaction.response.send_message(
+            f"Report {report['id']} added: {target} to {channel.mention} on `{schedule}`, next run "
+            + (f"<t:{int(next_run.timestamp())}:R>" if next_run else "never")
+        )
+        self.logger.info(f"Report {report['id']} for {target} added by {interaction.user.name}")
+
+    @grafanareport.command(name="list", description="List the scheduled reports of this server")
+    async def grafanareport_list(self, interaction: discord.Interaction):
+        """List scheduled reports
+        Usage: /grafanareport list
+        """
+        reports = [report for report in self.reports if report["guild_id"] == interaction.guild_id]
+        embed = discord.Embed(title="Grafana - Scheduled Reports", color=discord.Color.blue())
+        # Discord allows 25 fields per embed
+        for report in reports[:25]:
+            embed.add_field(
+                name=f"{report['id']}: {report['target']}"[:256],
+                value=(
+                    f"<#{report['channel_id']}> `{report['schedule']}` ({report['time_from']})\n"
+                    f"Posted {report.get('posted', 0)}, skipped as unchanged {report.get('skipped', 0)}"
+                ),
+                inline=False,
+            )
+        if not reports:
+            embed.description = "No reports scheduled."
+        elif not pillow_available():
+            embed.set_footer(text="Pillow is not installed, so every report is posted even when unchanged.")
+        await interaction.response.send_message(embed=embed)
+
+    @grafanareport.command(name="remove", description="Remove a scheduled report")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def grafanareport_remove(self, interaction: discord.Interaction, report_id: int):
+        """Remove a scheduled report
+        Usage: /grafanareport remove [report_id]
+        """
+        for report in self.reports:
+            if report["id"] == report_id and report["guild_id"] == interaction.guild_id:
+                self.reports.remove(report)
+                await self.save_report_config()
+                await interaction.response.send_message(f"Report {report_id} removed.")
+                self.logger.info(f"Report {report_id} removed by {interaction.user.name}")
+                return
+        await interaction.response.send_message(f"No report {report_id} on this server.", ephemeral=True)
+
 async def setup(bot):
     """Adds the cog to the bot
     :param bot: The bot to add the cog to
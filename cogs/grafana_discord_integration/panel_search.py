@@ -0,0 +1,91 @@
+import heapq
+import re
+
+# Discord shows at most 25 autocomplete choices
+MAX_CHOICES = 25
+NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    """Lower cases text and collapses everything that isn't a letter or digit into single spaces"""
+    return NON_ALPHANUMERIC.sub(" ", text.lower()).strip()
+
+
+def trigrams(text):
+    """The set of three character substrings of normalized text, padded so short words still produce trigrams"""
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class PanelSearchIndex:
+    """Precomputed token prefix and trigram index over panel names for ranked autocomplete"""
+
+    def __init__(self):
+        self.names = []
+        self.normalized = []
+        self.name_trigrams = []
+        self.prefixes = {}
+        self.trigram_postings = {}
+        self.default_choices = []
+        # The dashboard index generation this index was built from
+        self.generation = None
+
+    def build(self, names, generation=None):
+        """Rebuilds the index from a list of panel names
+        :param names: Every panel name which can be suggested
+        :param generation: The dashboard index generation the names came from
+        """
+        self.names = sorted(names, key=str.lower)
+        self.normalized = [normalize(name) for name in self.names]
+        self.name_trigrams = [trigrams(text) for text in self.normalized]
+        self.prefixes = {}
+        self.trigram_postings = {}
+        for index, text in enumerate(self.normalized):
+            for token in text.split():
+                for end in range(1, len(token) + 1):
+                    self.prefixes.setdefault(token[:end], set()).add(index)
+            for trigram in self.name_trigrams[index]:
+                self.trigram_postings.setdefault(trigram, set()).add(index)
+        self.default_choices = self.names[:MAX_CHOICES]
+        self.generation = generation
+
+    def search(self, query, limit=MAX_CHOICES):
+        """Returns up to limit panel names ranked by how well they match the query
+        Names starting with the query rank first, then names where every query word prefixes a word of the name,
+        then fuzzy matches sharing enough trigrams with the query, which tolerates typos.
+        :param query: What the user has typed so far
+        :param limit: The maximum number of names to return
+        :return: A list of panel names, best match first
+        """
+        text = normalize(query)
+        if not text:
+            return self.default_choices[:limit]
+        query_trigrams = trigrams(text)
+        scores = {}
+
+        tokens = text.split()
+        prefix_matches = set.intersection(*(self.prefixes.get(token, set()) for token in tokens))
+        for index in prefix_matches:
+            tier = 3 if self.normalized[index].startswith(text) else 2
+            scores[index] = tier
+
+        # Count shared trigrams only for names that share at least one, via the postings lists
+        shared = {}
+        for trigram in query_trigrams:
+            for index in self.trigram_postings.get(trigram, ()):
+                shared[index] = shared.get(index, 0) + 1
+        ranked = []
+        for index, count in shared.items():
+            similarity = count / len(query_trigrams | self.name_trigrams[index])
+            tier = scores.get(index)
+            if tier is None:
+                if count / len(query_trigrams) < 0.4:
+                    continue
+                tier = 1
+            ranked.append((tier, similarity, -len(self.names[index]), -index))
+        # Short queries can prefix-match without sharing a padded trigram
+        for index, tier in scores.items():
+            if index not in shared:
+                ranked.append((tier, 0.0, -len(self.names[index]), -index))
+        # Ties go to the shorter name, then alphabetical order
+        return [self.names[-entry[3]] for entry in heapq.nlargest(limit, ranked)]
@@ -0,0 +1,74 @@
+import discord
+
+from .render_queue import token_deadline
+
+# The time ranges offered on /grafana ipanel, in button order
+TIME_RANGES = ["1h", "6h", "12h", "24h", "7d", "30d"]
+
+
+class GrafanaInteractiveView(discord.ui.View):
+    """Time range buttons under a rendered panel. Pressing one re-renders the panel in the same message."""
+
+    def __init__(self, cog, panel_name, time_range, timeout=600):
+        """
+        :param cog: The Grafana cog, used to render and prefetch the panel
+        :param panel_name: The panel shown in the message
+        :param time_range: The range currently shown, one of TIME_RANGES
+        :param timeout: Seconds without a button press before the buttons are disabled. Must stay under Discord's
+            15 minute interaction token lifetime, or the message can no longer be edited to disable them.
+        """
+        super().__init__(timeout=timeout)
+        self.cog = cog
+        self.panel_name = panel_name
+        self.time_range = time_range
+        # The most recent interaction on this message, whose token is used to edit it
+        self.interaction = None
+        for label in TIME_RANGES:
+            button = discord.ui.Button(label=label)
+            button.callback = self.make_callback(label)
+            self.add_item(button)
+        self.highlight()
+
+    def highlight(self):
+        """Marks the button of the range on display"""
+        for button in self.children:
+            selected = button.label == self.time_range
+            button.style = discord.ButtonStyle.primary if selected else discord.ButtonStyle.secondary
+            button.disabled = selected
+
+    def make_callback(self, time_range):
+        async def callback(interaction: discord.Interaction):
+            await self.show_range(interaction, time_range)
+
+        return callback
+
+    async def show_range(self, interaction, time_range):
+        """Re-renders the panel for a range and replaces the image in the message"""
+        await interaction.response.defer()
+        self.interaction = interaction
+        try:
+            panel_file = await self.cog.fetch_rendered_panel(
+                self.panel_name, f"now-{time_range}", deadline=token_deadline(interaction.created_at)
+            )
+        except Exception as e:
+            self.cog.logger.error(f"Error fetching panel: {e}")
+            panel_file = None
+        if panel_file is None:
+            await interaction.followup.send(f"Failed to render {self.panel_name} for {time_range}.", ephemeral=True)
+            return
+        self.time_range = time_range
+        self.highlight()
+        await interaction.edit_original_response(
+            content=f"{self.panel_name}, last {time_range}", attachments=[panel_file], view=self
+        )
+        self.cog.prefetch_adjacent_ranges(self.panel_name, time_range)
+
+    async def on_timeout(self):
+        """Disables the buttons once the view stops listening, so stale buttons don't look clickable"""
+        for button in self.children:
+            button.disabled = True
+        if self.interaction is not None:
+            try:
+                await self.interaction.edit_original_response(view=self)
+            except discord.HTTPException:
+                pass
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import weakref
+
+CHUNK_SIZE = 64 * 1024
+
+
+class RenderByteBudget:
+    """Global cap on the bytes in-flight renders may hold in memory. Renders that don't fit spill to disk instead of waiting."""
+
+    def __init__(self, max_bytes):
+        """
+        :param max_bytes: The total bytes all in-flight renders may buffer in memory
+        """
+        self.max_bytes = max_bytes
+        self.in_use = 0
+        self.peak = 0
+        self.spills = 0
+
+    def try_acquire(self, size):
+        """Reserves size bytes if they fit in the budget
+        :return: True if the bytes were reserved
+        """
+        if self.in_use + size > self.max_bytes:
+            return False
+        self.in_use += size
+        self.peak = max(self.peak, self.in_use)
+        return True
+
+    def release(self, size):
+        """Returns reserved bytes to the budget"""
+        self.in_use -= size
+
+
+class SpooledRender:
+    """A render which was too large to keep in memory, held in a temp file that is removed once nothing references it"""
+
+    def __init__(self, directory=None):
+        """
+        :param directory: Where to create the temp file, the system temp directory when None
+        """
+        fd, self.path = tempfile.mkstemp(prefix="grafana-render-", suffix=".png", dir=directory)
+        self.file = os.fdopen(fd, "wb")
+        self.size = 0
+        # Readers open the path themselves, on POSIX their handles stay valid after the file is removed
+        self._finalizer = weakref.finalize(self, _remove_file, self.path)
+
+    def write(self, data):
+        self.file.write(data)
+        self.size += len(data)
+
+    def finish(self):
+        """Closes the write handle once the whole response has been written"""
+        self.file.close()
+
+    def discard(self):
+        """Closes and removes the temp file straight away, used when the render failed part way"""
+        self.file.close()
+        self._finalizer()
+
+    def __len__(self):
+        return self.size
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+async def read_render(response, budget, spool_threshold, spool_dir=None):
+    """Streams a render response in chunks, in memory while it is small and the budget allows, otherwise into a temp file
+    :param response: The aiohttp response
+    :param budget: The RenderByteBudget shared by every render
+    :param spool_threshold: Responses larger than this many bytes always go to disk
+    :param spool_dir: Directory for spilled renders
+    :return: The image bytes, or a SpooledRender if it spilled to disk
+    """
+    chunks = []
+    held = 0
+    spool = None
+    # Skip buffering entirely when Grafana says up front that the image is large
+    if response.content_length and response.content_length > spool_threshold:
+        spool = SpooledRender(spool_dir)
+    try:
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            if spool is None:
+                if held + len(chunk) <= spool_threshold and budget.try_acquire(len(chunk)):
+                    chunks.append(chunk)
+                    held += len(chunk)
+                    continue
+                # Too large or the budget is used up: move what we have to disk and release it
+                spool = SpooledRender(spool_dir)
+                for buffered in chunks:
+                    spool.write(buffered)
+                chunks.clear()
+                budget.release(held)
+                held = 0
+            # Writes land in the page cache, so they are cheap enough to do on the event loop
+            spool.write(chunk)
+        if spool is None:
+            return b"".join(chunks)
+    except BaseException:
+        if spool is not None:
+            spool.discard()
+        raise
+    finally:
+        budget.release(held)
+    budget.spills += 1
+    spool.finish()
+    return spool
@@ -0,0 +1,120 @@
+import re
+import time
+from collections import OrderedDict
+
+# Grafana relative time units in seconds (now-5m, now-6h, now-7d, now-1M ...)
+RELATIVE_TIME_UNITS = {
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+    "w": 7 * 86400,
+    "M": 30 * 86400,
+    "y": 365 * 86400,
+}
+RELATIVE_TIME_PATTERN = re.compile(r"^now-(\d+)([smhdwMy])$")
+
+
+def range_seconds(time_from, time_to="now"):
+    """Works out the length of a Grafana time range in seconds
+    :param time_from: The start of the range, e.g. now-6h or an epoch in milliseconds
+    :param time_to: The end of the range, e.g. now or an epoch in milliseconds
+    :return: The length of the range in seconds, or None if it can't be determined
+    """
+    if time_from is None:
+        return None
+    match = RELATIVE_TIME_PATTERN.match(str(time_from))
+    if match and time_to in (None, "now"):
+        return int(match.group(1)) * RELATIVE_TIME_UNITS[match.group(2)]
+    if str(time_from).isdigit() and str(time_to).isdigit():
+        return max(0, (int(time_to) - int(time_from)) // 1000)
+    return None
+
+
+def ttl_for_range(time_from, time_to="now", minimum=30, maximum=3600):
+    """Picks how long a render stays fresh based on the time range it shows
+    A panel covering the last hour changes visibly within a minute, a 30 day panel barely changes within an hour, so the
+    TTL is a sixtieth of the range (one pixel column's worth on a typical panel), clamped to [minimum, maximum].
+    Absolute ranges in the past never change and get the maximum TTL.
+    :param time_from: The start of the range
+    :param time_to: The end of the range
+    :param minimum: The shortest TTL in seconds
+    :param maximum: The longest TTL in seconds
+    :return: The TTL in seconds
+    """
+    if str(time_to).isdigit() and int(time_to) / 1000 < time.time():
+        return maximum
+    seconds = range_seconds(time_from, time_to)
+    if seconds is None:
+        # The dashboard's own default range, which is usually the last hour or so
+        return 60
+    return int(min(maximum, max(minimum, seconds / 60)))
+
+
+def make_render_key(kind, target, time_from=None, time_to=None, width=None, height=None, variables=None):
+    """Builds the cache key for a render
+    :param kind: panel or dashboard
+    :param target: A tuple identifying what is rendered, e.g. (dashboard_uid, panel_id)
+    :param variables: Dashboard template variables passed as var-<name> parameters
+    :return: A hashable key
+    """
+    return (kind, target, time_from, time_to, width, height, tuple(sorted((variables or {}).items())))
+
+
+class RenderCache:
+    """LRU cache of rendered images bounded by their total size in bytes, with a TTL per entry"""
+
+    def __init__(self, max_bytes):
+        """
+        :param max_bytes: The total size of cached images before the least recently used are evicted
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the cached image bytes for a key, or None if it is missing or expired"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        data, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def ttl_remaining(self, key):
+        """Seconds until a cached entry expires, 0 if it is missing. Does not count as a hit or miss."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return 0
+        return max(0, entry[1] - time.monotonic())
+
+    def put(self, key, data, ttl):
+        """Caches image bytes for ttl seconds, evicting the least recently used entries to stay within the byte budget"""
+        if len(data) > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (data, time.monotonic() + ttl)
+        self.total_bytes += len(data)
+        while self.total_bytes > self.max_bytes:
+            oldest_key = next(iter(self.entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key):
+        data, _ = self.entries.pop(key)
+        self.total_bytes -= len(data)
+
+    def clear(self):
+        """Drops every cached image"""
+        self.entries.clear()
+        self.total_bytes = 0
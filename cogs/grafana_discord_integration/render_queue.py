@@ -0,0 +1,202 @@
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta, timezone
+
+# Lower numbers run first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DASHBOARD = 1
+PRIORITY_BACKGROUND = 2
+
+# Discord interaction tokens are valid for 15 minutes, after which a deferred response can't be completed
+INTERACTION_TOKEN_LIFETIME = timedelta(minutes=15)
+
+
+class RenderQueueFull(Exception):
+    """Raised when the queue is full of jobs at the same or higher priority"""
+
+
+class RenderJobExpired(Exception):
+    """Raised when a job's deadline passed before its render finished"""
+
+
+def token_deadline(created_at):
+    """Converts an interaction's creation time to a time.monotonic() deadline at which its token expires
+    :param created_at: The aware datetime the interaction was created
+    :return: The monotonic deadline
+    """
+    remaining = created_at + INTERACTION_TOKEN_LIFETIME - datetime.now(timezone.utc)
+    return time.monotonic() + remaining.total_seconds()
+
+
+class RenderJob:
+    """A queued render. Waiters share its result, and it is cancelled when the last one gives up."""
+
+    def __init__(self, run, priority, timeout, deadline, sequence):
+        self.run = run
+        self.priority = priority
+        self.timeout = timeout
+        self.deadline = deadline
+        self.sequence = sequence
+        self.future = asyncio.get_running_loop().create_future()
+        self.task = None
+        self.waiters = 0
+
+    def cancel(self):
+        """Cancels the job whether it is waiting or running"""
+        if self.task is not None:
+            self.task.cancel()
+        elif not self.future.done():
+            self.future.cancel()
+
+
+class RenderQueue:
+    """Bounded priority queue of render jobs processed by a fixed number of workers"""
+
+    def __init__(self, workers, max_pending, logger):
+        """
+        :param workers: How many renders run at once
+        :param max_pending: How many jobs may wait for a worker
+        :param logger: The bot logger
+        """
+        self.worker_count = workers
+        self.max_pending = max_pending
+        self.logger = logger
+        self.heap = []
+        self.pending = set()
+        self.running = 0
+        self.sequence = itertools.count()
+        self.wakeup = None
+        self.workers = []
+        self.expired = 0
+        self.shed = 0
+        self.abandoned = 0
+
+    def start(self):
+        """Starts the workers, done lazily so the queue can be created before the event loop runs"""
+        if not self.workers:
+            self.wakeup = asyncio.Condition()
+            self.workers = [asyncio.create_task(self.worker()) for _ in range(self.worker_count)]
+
+    async def close(self):
+        """Stops the workers and cancels every job"""
+        for worker in self.workers:
+            worker.cancel()
+        for job in list(self.pending):
+            job.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def submit(self, run, priority, timeout, deadline=None):
+        """Queues a render
+        :param run: Coroutine function performing the render
+        :param priority: One of the PRIORITY_ constants
+        :param timeout: Seconds the render may run for once started
+        :param deadline: time.monotonic() after which nobody needs the result, None for no deadline
+        :return: The RenderJob, pass it to wait() for the result
+        """
+        job = self.create_job(run, priority, timeout, deadline)
+        try:
+            await self.push(job)
+        except BaseException:
+            job.cancel()
+            raise
+        return job
+
+    def create_job(self, run, priority, timeout, deadline=None):
+        """The synchronous part of submit(): admits a job to the queue without handing it to the workers yet
+        Callers which must publish the job before yielding to the event loop, such as single flight tables, call this,
+        publish the job, then await push(). The arguments are those of submit().
+        :return: The RenderJob
+        """
+        self.start()
+        now = time.monotonic()
+        for stale in [job for job in self.pending if job.deadline is not None and job.deadline <= now]:
+            self.expired += 1
+            stale.future.set_exception(RenderJobExpired("The interaction expired before the render started"))
+        if len(self.pending) >= self.max_pending:
+            # Make room by shedding the newest job of the lowest priority, if it is below the new one
+            victim = max(self.pending, key=lambda job: (job.priority, job.sequence))
+            if victim.priority <= priority:
+                raise RenderQueueFull("The render queue is full")
+            self.logger.warning("Render queue full, dropping a lower priority render")
+            self.pending.discard(victim)
+            victim.future.set_exception(RenderQueueFull("Dropped for a higher priority render"))
+            self.shed += 1
+        job = RenderJob(run, priority, timeout, deadline, next(self.sequence))
+        self.pending.add(job)
+        job.future.add_done_callback(lambda _: self.pending.discard(job))
+        return job
+
+    async def push(self, job):
+        """Hands a job from create_job() to the workers"""
+        async with self.wakeup:
+            heapq.heappush(self.heap, (job.priority, job.sequence, job))
+            self.wakeup.notify()
+
+    async def promote(self, job, priority, deadline=None):
+        """Raises a waiting job's priority and extends its deadline when a more urgent requester joins it"""
+        if deadline is None or job.deadline is None:
+            job.deadline = None
+        else:
+            job.deadline = max(job.deadline, deadline)
+        if priority < job.priority and job in self.pending:
+            # The old heap entry is skipped when popped, since the job will have started or finished by then
+            job.priority = priority
+            await self.push(job)
+
+    async def wait(self, job):
+        """Waits for a job's result. If every waiter gives up before it finishes, the job is cancelled."""
+        job.waiters += 1
+        try:
+            return await asyncio.shield(job.future)
+        finally:
+            job.waiters -= 1
+            if job.waiters == 0 and not job.future.done():
+                self.logger.info("Render abandoned by every requester, cancelling it")
+                self.abandoned += 1
+                job.cancel()
+
+    async def worker(self):
+        while True:
+            async with self.wakeup:
+                await self.wakeup.wait_for(lambda: self.heap)
+                priority, _, job = heapq.heappop(self.heap)
+            if job.future.done() or job.task is not None or priority != job.priority:
+                continue
+            self.pending.discard(job)
+            timeout = job.timeout
+            if job.deadline is not None:
+                remaining = job.deadline - time.monotonic()
+                if remaining <= 0:
+                    self.expired += 1
+                    job.future.set_exception(RenderJobExpired("The interaction expired before the render started"))
+                    continue
+                timeout = min(timeout, remaining)
+            self.running += 1
+            job.task = asyncio.create_task(job.run())
+            try:
+                result = await asyncio.wait_for(asyncio.shield(job.task), timeout)
+            except asyncio.TimeoutError:
+                job.task.cancel()
+                if timeout < job.timeout:
+                    self.expired += 1
+                    job.future.set_exception(RenderJobExpired("The interaction expired during the render"))
+                else:
+                    job.future.set_exception(asyncio.TimeoutError())
+            except asyncio.CancelledError:
+                if not job.task.cancelled():
+                    # The worker itself is being stopped
+                    job.task.cancel()
+                    raise
+                if not job.future.done():
+                    job.future.cancel()
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self.running -= 1
@@ -0,0 +1,128 @@
+import json
+import os
+from datetime import timedelta
+from io import BytesIO
+
+from .compositor import pillow_available
+
+CRON_FIELDS = [
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 6),
+]
+
+
+class CronError(ValueError):
+    """Raised when a cron expression can't be parsed"""
+
+
+def parse_cron_field(field, low, high):
+    """Expands one cron field (*, 5, 1-5, */15, 0-30/10, 1,15) to the set of values it allows"""
+    values = set()
+    for part in field.split(","):
+        base, _, step = part.partition("/")
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            start, end = (int(value) for value in base.split("-", 1))
+        else:
+            start = end = int(base)
+        if step:
+            # 5/15 means every 15 starting at 5
+            if base != "*" and "-" not in base:
+                end = high
+            step = int(step)
+        else:
+            step = 1
+        if start < low or end > high or start > end or step < 1:
+            raise CronError(f"{part} is out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """A standard five field cron expression: minute hour day-of-month month day-of-week (0 is Sunday)"""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise CronError("A cron expression needs five fields: minute hour day month weekday")
+        self.expression = expression
+        try:
+            self.minutes, self.hours, self.days, self.months, self.weekdays = (
+                parse_cron_field(field, low, high) for field, (_, low, high) in zip(fields, CRON_FIELDS)
+            )
+        except ValueError as e:
+            raise CronError(f"Invalid cron expression {expression}: {e}") from e
+        # Like cron, a restricted day-of-month and day-of-week match when either does
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def day_matches(self, moment):
+        """Whether the schedule fires on the day of a datetime"""
+        if moment.month not in self.months:
+            return False
+        day_match = moment.day in self.days
+        # datetime weekdays start at Monday=0, cron at Sunday=0
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def matches(self, moment):
+        """Whether the schedule fires in the minute of a datetime"""
+        return moment.minute in self.minutes and moment.hour in self.hours and self.day_matches(moment)
+
+    def next_after(self, moment, limit_days=366):
+        """The first minute after moment at which the schedule fires, or None if there is none within limit_days"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        end = candidate + timedelta(days=limit_days)
+        while candidate < end:
+            if not self.day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        return None
+
+
+def difference_hash(image, hash_size=8):
+    """Computes a 64 bit difference hash, which barely changes when an image is visually the same
+    Each bit records whether a pixel of a small greyscale thumbnail is brighter than its right neighbour. CPU bound,
+    so run it in a worker thread.
+    :param image: Encoded image bytes, or a path to an image file
+    :param hash_size: The hash has hash_size * hash_size bits
+    :return: The hash as an int
+    """
+    if not pillow_available():
+        raise RuntimeError("Pillow is required to hash images")
+    from PIL import Image
+
+    source = BytesIO(image) if isinstance(image, (bytes, bytearray)) else image
+    with Image.open(source) as opened:
+        pixels = list(opened.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS).getdata())
+    value = 0
+    for row in range(hash_size):
+        for column in range(hash_size):
+            left = pixels[row * (hash_size + 1) + column]
+            right = pixels[row * (hash_size + 1) + column + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def hash_distance(first, second):
+    """The number of differing bits between two hashes"""
+    return bin(first ^ second).count("1")
+
+
+def load_reports(path):
+    """Loads the saved report schedules, an empty list if there are none yet"""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
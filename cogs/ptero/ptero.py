@@ -10,19 +10,18 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import aiohttp
-import os
-from dotenv import load_dotenv
 import logging
 import time
+from settings import get_settings
 
 class QuantumPterodactyl(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         # We will use the same logger as we use for the client in QCAdmin loaded cogs
         self.logger = bot.logger
-        load_dotenv()
-        self.api_key = os.getenv("PTERODACTYL_API_KEY")
-        self.panel_url = os.getenv("PTERODACTYL_PANEL_URL")
+        settings = get_settings()
+        self.api_key = settings.pterodactyl_api_key
+        self.panel_url = settings.pterodactyl_panel_url
 
         if not all([self.api_key, self.panel_url]):
             self.logger.error("Missing required Pterodactyl dotenv variables")
@@ -1,13 +1,11 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from dotenv import load_dotenv
 import asyncio
-import os
 import time
 from discord.ext.commands import has_permissions
 from typing import Optional
-from mcrcon import MCRcon
+from settings import get_settings
 
 # * Define the intents for the bot (this is required for the discord-py-slash-commands library))
 intents = discord.Intents.default()
@@ -17,13 +15,6 @@ intents.guilds = True
 intents.reactions = True
 intents.members = True
 
-# * Load the .env to get the rcon server details
-load_dotenv()
-
-rcon_host = str(os.getenv("RCON_HOST"))
-rcon_password = str(os.getenv("RCON_PASSWORD"))
-rcon_port = int(os.getenv("RCON_PORT"))
-
 # section Code defining the Cog and its attributes/functions
 
 
@@ -31,6 +22,19 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.logger = bot.logger
+        self.settings = get_settings()
+        if not self.settings.rcon_configured:
+            self.logger.warning("RCON_HOST, RCON_PASSWORD and RCON_PORT are not all set, RCON commands will fail")
+
+    def connect(self):
+        """Opens an RCON connection to the Minecraft server, use it as a context manager
+        mcrcon is imported here so loading the cog doesn't pay for it.
+        """
+        from mcrcon import MCRcon
+
+        if not self.settings.rcon_configured:
+            raise RuntimeError("RCON_HOST, RCON_PASSWORD and RCON_PORT must be set to use RCON commands")
+        return MCRcon(self.settings.rcon_host, self.settings.rcon_password, port=self.settings.rcon_port)
 
     # discord - rcon command group for use with the discord-py-slash-commands library, this will group the rcon related commands beneath /rcon.
     # discord - due to the number of commands, the rcon command group is further split into subgroups for better organisation. (world, )
@@ -45,7 +49,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     async def say(self, *thing_to_say: str):
         """Send a message from the Bot to the server. Usage <message>"""
         command = f"say {thing_to_say}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             self.logger.info(f"Bot said {thing_to_say} in the server chat.")
 
@@ -55,7 +59,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
         try:
             start_time = time.time()
             command = f"status"
-            with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+            with self.connect() as mcr:
                 response = mcr.command(command)
                 end_time = time.time()
             # get the ping of the server, start time - end time * 1000 to get the latency in ms
@@ -87,7 +91,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
             )
             return
         command = f"/weather {weather_type}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Weather changed to {weather_type}."
@@ -104,7 +108,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Set a player's ability value. Usage <player> <ability> <value>"""
         command = f"{player} {ability} {value}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"{player} ability: {ability} set to {value}."
@@ -127,7 +131,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Grant or revoke advancements to players. Usage <player> <action> <advancement>"""
         command = f"{player} {action} {advancement}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"{player} was {action} {advancement}."
@@ -141,7 +145,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     async def ban(self, Interaction: discord.Interaction, player: str):
         """Ban a player from the server. Usage <player>"""
         command = f"ban {player}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"{player} has been banned from the server."
@@ -155,7 +159,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     async def ban_ip(self, Interaction: discord.Interaction, ip: str):
         """Ban an IP address from the server. Usage <ip>"""
         command = f"ban-ip {ip}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"{ip} has been banned from the server."
@@ -167,7 +171,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     async def banlist(self, Interaction: discord.Interaction):
         """List all banned players."""
         command = "banlist"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             if response:
                 await Interaction.response.send_message(f"Banned players: {response}")
@@ -191,7 +195,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
         command = (
             f"clear {player} {item if item else ''} {count if count else ''}".strip()
         )
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Cleared items from {player}'s inventory."
@@ -217,7 +221,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Clone blocks. Usage <start_pos> <end_pos> <destination> [mask_mode] [clone_mode] [tile_mode]"""
         command = f"clone {start_pos} {end_pos} {destination} {mask_mode if mask_mode else ''} {clone_mode if clone_mode else ''} {tile_mode if tile_mode else ''}".strip()
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
         await Interaction.response.send_message(
             f"Blocks cloned from {start_pos} to {end_pos} to {destination}."
@@ -235,7 +239,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Damage entities. Usage <entities> <amount>"""
         command = f"damage {entities} {amount}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
         await Interaction.response.send_message(f"Damaged {entities} by {amount}.")
 
@@ -247,7 +251,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     async def daylock(self, Interaction: discord.Interaction, action: str):
         """Lock or unlock the day-night cycle. Alias: alwaysday. Usage <action>"""
         command = f"daylock {action}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
         await Interaction.response.send_message(f"Daylock {action}.")
 
@@ -258,7 +262,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     async def difficulty(self, Interaction: discord.Interaction, level: int):
         """Change the game difficulty. Usage <level>"""
         command = f"difficulty {level}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(f"Game difficulty set to {level}.")
 
@@ -272,7 +276,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Set or query a game rule value. Usage <rule> [value]"""
         command = f"gamerule {rule} {value if value else ''}".strip()
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
         await Interaction.response.send_message(
             f"Game rule {rule} set to {value}."
@@ -295,7 +299,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Give an effect to a player or entity. Usage <target> <effect> [duration] [amplifier]"""
         command = f"effect give {target} {effect} {duration if duration else ''} {amplifier if amplifier else ''}".strip()
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Effect {effect} given to {target}."
@@ -315,7 +319,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Enchant a player item. Usage <player> <enchantment> [level]"""
         command = f"enchant {player} {enchantment} {level if level else ''}".strip()
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Enchantment {enchantment} applied to {player}."
@@ -341,7 +345,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Fill a region with a specific block. Usage <start_pos> <end_pos> <block> [mode]"""
         command = f"fill {start_pos} {end_pos} {block} {mode if mode else ''}".strip()
-        async with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Filled region from {start_pos} to {end_pos} with {block}."
@@ -359,7 +363,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Fill a region with a specific biome. Usage <start_pos> <end_pos> <biome>"""
         command = f"fillbiome {start_pos} {end_pos} {biome}"
-        async with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Filled region from {start_pos} to {end_pos} with {biome}."
@@ -375,7 +379,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Give items to a player. Usage <player> <item> <amount>"""
         command = f"give {player} {item} {amount}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Gave {amount} of {item} to {player}."
@@ -391,7 +395,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Kick a player from the server. Usage <player> [reason]"""
         command = f"kick {player} {reason}" if reason else f"kick {player}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"{player} has been kicked from the server. Reason: {reason}"
@@ -409,9 +413,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     async def list_players(self, Interaction: discord.Interaction):
         """List all players on the server."""
         command = "list"
-        with MCRcon(
-            rcon_host, rcon_password, port=int(rcon_port)
-        ) as mcr:  # Ensure port is an integer
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Denizens on the server: {response}"
@@ -424,9 +426,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     async def op(self, Interaction: discord.Interaction, player: str):
         """Grant operator status to a player. Usage <player>"""
         command = "op"
-        async with MCRcon(
-            rcon_host, rcon_password, port=int(rcon_port)
-        ) as mcr:  # Ensure port is an integer
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Operator status granted to {player},  {response}"
@@ -456,7 +456,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
             command += f" mirror={mirror}"
         if mode:
             command += f" mode={mode}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Placed {feature} at ({x}, {y}, {z})"
@@ -470,9 +470,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     async def seed(self, Interaction: discord.Interaction):
         """Get the world seed."""
         command = "seed"
-        with MCRcon(
-            rcon_host, rcon_password, port=int(rcon_port)
-        ) as mcr:  # Ensure port is an integer
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(f"World seed: {response}")
 
@@ -492,7 +490,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Place a block at a location. Usage <x> <y> <z> <block> [mode]"""
         command = f"setblock {x} {y} {z} {block}" + (f" {mode}" if mode else "")
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Block {block} placed at ({x}, {y}, {z})"
@@ -508,7 +506,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     async def setidletimeout(self, Interaction: discord.Interaction, timeout: int):
         """Set the idle timeout for players. Usage <timeout>"""
         command = f"setidletimeout {timeout}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Idle timeout set to {timeout} minutes."
@@ -522,7 +520,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     async def setmaxplayers(self, Interaction: discord.Interaction, max_players: int):
         """Set the maximum number of players. Usage <max_players>"""
         command = f"setmaxplayers {max_players}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Maximum players set to {max_players}."
@@ -537,7 +535,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Set the world spawn. Usage [x y z]"""
         command = f"setworldspawn {x} {y} {z}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"World spawn set to ({x}, {y}, {z})."
@@ -551,7 +549,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Set the world spawn. Usage [x y z]"""
         command = f"spawnpoint {player} {pos}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
         await Interaction.response.send_message(
             f"Spawnpoint set to {pos} for {player}."
@@ -566,7 +564,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Summon an entity. Usage <entity> <x> <y> <z>"""
         command = f"summon {entity} {x} {y} {z}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Summoned {entity} at ({x}, {y}, {z})."
@@ -581,7 +579,7 @@ class Quantum_RCON_Commands_Cog(commands.Cog):
     ):
         """Teleport a player. Usage <player> <x> <y> <z>"""
         command = f"tp {player} {x} {y} {z}"
-        with MCRcon(rcon_host, rcon_password, port=rcon_port) as mcr:
+        with self.connect() as mcr:
             response = mcr.command(command)
             await Interaction.response.send_message(
                 f"Teleported {player} to ({x}, {y}, {z})."
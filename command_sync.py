@@ -0,0 +1,41 @@
+import hashlib
+import json
+
+from atomic_file import write_atomic
+
+SYNC_STATE_FILE = "./config/command_sync.json"
+
+
+def command_payload(tree, guild=None):
+    """Serializes the commands of a tree the way they are sent to Discord when syncing
+    :param tree: The bot's CommandTree
+    :param guild: A guild to serialize the guild specific commands of, global commands when None
+    :return: A list of command payload dicts
+    """
+    commands = tree.get_commands(guild=guild)
+    try:
+        return [command.to_dict(tree) for command in commands]
+    except TypeError:  # discord.py before 2.4 takes no tree argument
+        return [command.to_dict() for command in commands]
+
+
+def command_tree_hash(tree, guild=None):
+    """A stable hash of the commands that would be synced, which only changes when a sync is needed"""
+    payload = json.dumps(command_payload(tree, guild), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_sync_state(path=SYNC_STATE_FILE):
+    """Loads the hashes of the last synced command trees, keyed by global or guild:<id>"""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_sync_state(state, path=SYNC_STATE_FILE):
+    """Saves the hashes of the last synced command trees, replacing the file atomically. Blocking, so call it through
+    asyncio.to_thread.
+    """
+    write_atomic(path, json.dumps(state, indent=4))
@@ -0,0 +1,263 @@
+import gzip
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+from collections import deque, namedtuple
+
+TAIL_CHUNK_SIZE = 64 * 1024
+
+
+def tail_lines(path, num_lines, pattern=None, max_scan_bytes=16 * 1024 * 1024):
+    """Reads the last lines of a file by seeking backwards from the end in blocks
+    Only the blocks holding the requested lines are read, so the cost depends on the lines wanted, not the file size.
+    Blocking, so call it through asyncio.to_thread.
+    :param path: The file to read
+    :param num_lines: How many lines to return
+    :param pattern: A compiled regex, only lines it matches are returned
+    :param max_scan_bytes: Stop searching backwards after this many bytes, bounding the cost of filters that rarely match
+    :return: The matching lines, oldest first, without line endings
+    """
+    lines = []
+    with open(path, "rb") as file:
+        position = file.seek(0, os.SEEK_END)
+        scanned = 0
+        # Bytes of a line that started before the current block
+        partial = b""
+        while position > 0 and len(lines) < num_lines and scanned < max_scan_bytes:
+            read_size = min(TAIL_CHUNK_SIZE, position)
+            position -= read_size
+            file.seek(position)
+            block = file.read(read_size) + partial
+            scanned += read_size
+            block_lines = block.split(b"\n")
+            # The first piece may be the end of a line that continues in the previous block
+            partial = block_lines.pop(0)
+            for raw_line in reversed(block_lines):
+                line = raw_line.decode("utf-8", "replace").rstrip("\r")
+                if not line or (pattern is not None and not pattern.search(line)):
+                    continue
+                lines.append(line)
+                if len(lines) == num_lines:
+                    break
+        if position == 0 and partial and len(lines) < num_lines:
+            line = partial.decode("utf-8", "replace").rstrip("\r")
+            if pattern is None or pattern.search(line):
+                lines.append(line)
+    lines.reverse()
+    return lines
+
+
+def gzip_namer(name):
+    """Names rotated logs with a .gz suffix"""
+    return f"{name}.gz"
+
+
+def gzip_rotator(source, dest):
+    """Compresses a rotated log into its archive and removes the uncompressed file"""
+    with open(source, "rb") as plain, gzip.open(dest, "wb") as compressed:
+        shutil.copyfileobj(plain, compressed)
+    os.remove(source)
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler which gzips each rotated file, keeping backupCount archives (bot.log.1.gz, bot.log.2.gz ...)"""
+
+    def __init__(self, filename, max_bytes, backup_count, encoding="utf-8"):
+        super().__init__(filename, mode="a", maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self.namer = gzip_namer
+        self.rotator = gzip_rotator
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler over a bounded queue that never blocks the logging thread
+    When the queue is full, records below WARNING are dropped. Warnings and errors evict the oldest queued record
+    instead, so they are kept. A warning with the number of dropped records is logged once the queue has drained.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.unreported = 0
+
+    def enqueue(self, record):
+        # Wait until the queue has drained to half full before reporting drops, so reports don't add to a backlog
+        if self.unreported and self.queue.qsize() <= self.queue.maxsize // 2 and self.try_put(self.dropped_record()):
+            self.unreported = 0
+        if self.try_put(record):
+            return
+        if record.levelno >= logging.WARNING:
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+            except queue.Empty:
+                pass
+            if self.try_put(record):
+                self.count_drop()
+                return
+        self.count_drop()
+
+    def try_put(self, record):
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            return False
+
+    def count_drop(self):
+        self.dropped += 1
+        self.unreported += 1
+
+    def dropped_record(self):
+        """A warning reporting how many records were dropped since the last report"""
+        return logging.LogRecord(
+            self.name or "logging", logging.WARNING, __file__, 0,
+            f"Log queue full, dropped {self.unreported} log records", None, None,
+        )
+
+
+class QueueLogListener(logging.handlers.QueueListener):
+    """QueueListener whose stop() waits for room in a full queue rather than failing to enqueue its sentinel"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def start_queue_logging(logger, handlers, max_queue=10000):
+    """Moves a logger's output onto a background thread
+    The logger gets a DroppingQueueHandler over a bounded queue, and a QueueListener thread passes the records on to
+    the real handlers, so slow disks or a blocked stdout never stall the event loop.
+    :param logger: The logger to route through the queue
+    :param handlers: The handlers that write the records, e.g. file and console handlers
+    :param max_queue: How many records can wait for the listener before records are dropped
+    :return: The (DroppingQueueHandler, QueueListener) pair, stop the listener on shutdown to flush the queue
+    """
+    log_queue = queue.Queue(maxsize=max_queue)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.name = logger.name
+    listener = QueueLogListener(log_queue, *handlers, respect_handler_level=True)
+    logger.addHandler(queue_handler)
+    listener.start()
+    return queue_handler, listener
+
+
+# One record held by LogRingBuffer
+LogEntry = namedtuple("LogEntry", ["sequence", "created", "levelno", "levelname", "logger", "source", "message"])
+
+
+def record_source(record):
+    """The cog a record was logged from, taken from its file path, or the logger name for code outside the cogs
+    Every cog logs through the bot's shared logger, so the logger name alone doesn't say which cog a record came from.
+    """
+    parts = os.path.normpath(record.pathname).split(os.sep)
+    if "cogs" in parts[:-2]:
+        return parts[parts.index("cogs") + 1]
+    return record.name
+
+
+class LogRingBuffer(logging.Handler):
+    """Fixed capacity in-memory buffer of recent records, indexed by level, source and time for searching
+    Searches never touch the log file. Records are written by the logging thread and searched from the event loop, both
+    under the handler lock.
+    """
+
+    def __init__(self, capacity=5000, level=logging.NOTSET):
+        super().__init__(level)
+        self.capacity = capacity
+        self.entries = [None] * capacity
+        # Total records ever added, the next record's sequence number
+        self.count = 0
+        # Sequence numbers per level and per source, oldest first, pruned lazily as the ring overwrites them
+        self.by_level = {}
+        self.by_source = {}
+
+    @property
+    def oldest(self):
+        """The sequence number of the oldest record still held"""
+        return max(0, self.count - self.capacity)
+
+    def emit(self, record):
+        try:
+            message = record.getMessage()
+            if record.exc_info and not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            if record.exc_text:
+                message = f"{message}\n{record.exc_text}"
+            source = record_source(record)
+            entry = LogEntry(
+                self.count, record.created, record.levelno, record.levelname, record.name, source, message
+            )
+            self.entries[entry.sequence % self.capacity] = entry
+            self.count += 1
+            oldest = self.oldest
+            for index, key in ((self.by_level, record.levelno), (self.by_source, source)):
+                sequences = index.setdefault(key, deque(maxlen=self.capacity))
+                sequences.append(entry.sequence)
+                while sequences[0] < oldest:
+                    sequences.popleft()
+        except Exception:
+            self.handleError(record)
+
+    def entry(self, sequence):
+        return self.entries[sequence % self.capacity]
+
+    def first_since(self, timestamp):
+        """Binary search for the sequence number of the first held record created at or after timestamp"""
+        low, high = self.oldest, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.entry(middle).created < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def sources(self):
+        """The sources with records still in the buffer"""
+        with self.lock:
+            oldest = self.oldest
+            return sorted(source for source, sequences in self.by_source.items() if sequences and sequences[-1] >= oldest)
+
+    def search(self, min_level=logging.NOTSET, source=None, since=None, pattern=None, limit=50):
+        """Finds the most recent records matching every filter given
+        :param min_level: Only records at or above this level
+        :param source: Only records from this cog or logger
+        :param since: Only records created at or after this epoch timestamp
+        :param pattern: A compiled regex the message must match
+        :param limit: The maximum number of records to return
+        :return: A list of LogEntry, oldest first
+        """
+        with self.lock:
+            start = self.first_since(since) if since is not None else self.oldest
+            # Walk the smallest index that applies instead of the whole buffer
+            if source is not None:
+                candidates = [sequence for sequence in self.by_source.get(source, ()) if sequence >= start]
+            elif min_level > logging.DEBUG:
+                candidates = sorted(
+                    sequence
+                    for level, sequences in self.by_level.items()
+                    if level >= min_level
+                    for sequence in sequences
+                    if sequence >= start
+                )
+            else:
+                candidates = range(start, self.count)
+            matches = []
+            for sequence in reversed(candidates):
+                entry = self.entry(sequence)
+                if entry.levelno < min_level or (source is not None and entry.source != source):
+                    continue
+                if pattern is not None and not pattern.search(entry.message):
+                    continue
+                matches.append(entry)
+                if len(matches) == limit:
+                    break
+        matches.reverse()
+        return matches
+
+
+def format_entry(entry):
+    """Formats a LogEntry like the log file does"""
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.created))
+    return f"{timestamp}:{entry.levelname}:{entry.source}: {entry.message}"
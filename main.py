@@ -1,13 +1,18 @@
 import discord
 import sys
 from discord import app_commands
-from dotenv import load_dotenv
 import asyncio
 import logging
 from discord.ext import commands
 from discord import File
-import os
 import io
+import re
+import time
+from cog_loader import COG_CONFIG_FILE, load_extensions, read_cog_config
+from command_sync import command_tree_hash, load_sync_state, save_sync_state
+from log_tools import CompressingRotatingFileHandler, LogRingBuffer, format_entry, start_queue_logging, tail_lines
+from settings import get_settings
+from typing import List, Literal
 
 intents = discord.Intents.default()
 intents.message_content = True
@@ -16,12 +21,14 @@ intents.guilds = True
 intents.reactions = True
 intents.members = True
 
-load_dotenv()
+LOG_FILE = "quantumly_confused_bot.log"
 
 class QCAdmin(commands.Cog):
     def __init__(self, bot):
         """Initializes the QCAdmin class with necessary setup for admin commands and cog management."""
         self.bot = bot
+        # Loads .env before anything reads the environment
+        self.settings = get_settings()
         self.logger = self.setup_logger()
         print("QCAdmin initialized")
         self.logger.info("QCAdmin initialized")
@@ -30,22 +37,35 @@ class QCAdmin(commands.Cog):
         """Sets up logging for the bot."""
         logger = logging.getLogger("quantumly_confused_bot_log")
         logger.setLevel(logging.DEBUG)
-        handler = logging.FileHandler("quantumly_confused_bot.log", encoding="utf-8", mode="a")
+        # Rotate by size and gzip the old files, so the log can't grow without bound
+        handler = CompressingRotatingFileHandler(
+            LOG_FILE,
+            max_bytes=int(self.settings.log_max_mb * 1024 * 1024),
+            backup_count=self.settings.log_backup_count,
+        )
         console_handler = logging.StreamHandler(sys.stdout)
         handler.setFormatter(logging.Formatter("%(asctime)s:%(levelname)s:%(name)s: %(message)s"))
         console_handler.setFormatter(logging.Formatter("%(asctime)s:%(levelname)s:%(name)s: %(message)s"))
-        logger.addHandler(handler)
-        logger.addHandler(console_handler)
+        # Recent records are also kept in memory for /admin logbuffer and /admin logsearch
+        self.log_buffer = LogRingBuffer(self.settings.log_buffer_size)
+        # Records are queued and written by a listener thread, so disk or stdout stalls never block the event loop
+        self.log_queue_handler, self.log_listener = start_queue_logging(
+            logger, [handler, console_handler, self.log_buffer], self.settings.log_queue_size
+        )
         print(f"Log file created at: {handler.baseFilename}")
         return logger
     
-    def add_logger_memory_handler(self):
-        """Adds a memory handler to capture buffered log data."""
-        # hold logs in memory and buffer up to 100 log records
-        memory_handler = logging.handlers.MemoryHandler(capacity=100, target=None)
-        memory_handler.setFormatter(logging.Formatter("%(asctime)s:%(levelname)s:%(name)s: %(message)s"))
-        self.logger.addHandler(memory_handler)
-        self.memory_handler = memory_handler
+    async def send_log_lines(self, Interaction: discord.Interaction, lines, filename):
+        """Sends log lines in a code block, or as a text file attachment when they don't fit in a message"""
+        log_content = "\n".join(lines)
+        # 2000 characters per message, less the code block markers
+        if len(log_content) <= 1990:
+            await Interaction.followup.send(f"```{log_content}```")
+        else:
+            await Interaction.followup.send(
+                f"{len(lines)} log lines attached.",
+                file=File(io.BytesIO(log_content.encode("utf-8")), filename=filename),
+            )
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -56,12 +76,8 @@ class QCAdmin(commands.Cog):
         self.logger.info(f"Logged in as {self.bot.user.name} Discord.py API version: {discord.__version__} Bot ID: {self.bot.user.id}")
 
     def is_mod_or_admin():
-        async def predicate(ctx):
-            mod_role = discord.utils.get(ctx.guild.roles, name="Moderation Team")
-            owner_role = discord.utils.get(ctx.guild.roles, name="Owner")
-            admin_role = discord.utils.get(ctx.guild.roles, name="Admin")
-            return mod_role in ctx.author.roles or admin_role in ctx.author.roles or owner_role in ctx.author.roles
-        return commands.check(predicate)
+        # An app_commands check, commands.check is ignored by slash commands
+        return app_commands.checks.has_any_role("Moderation Team", "Admin", "Owner")
 
     # Admin command group
     admin = app_commands.Group(name="admin", description="Admin commands for the bot.")
@@ -73,35 +89,69 @@ class QCAdmin(commands.Cog):
         await Interaction.response.defer()
         try:
             self.logger.info(f"Command sync initiated by {Interaction.user}...")
-            synced = await self.bot.tree.sync()
-            await Interaction.followup.send(f"Commands synced successfully! Synced {len(synced)} commands.")
-            self.logger.info(f"Synced {len(synced)} commands.")
+            synced = await self.sync_command_tree(force=True)
+            await Interaction.followup.send(f"Commands synced successfully! Synced {synced} commands.")
         except Exception as e:
             self.logger.error(f"Sync failed: {e}")
             await Interaction.followup.send(f"Sync failed: {e}")
             
     @admin.command(name="logbuffer", description="Command to capture logs from the log memory buffer.")
-    async def memory_logbuffer(self, ctx):
-        """Command to capture logs from the log memory buffer."""
-        # Flush memory handler to the buffer 
-        self.memory_handler.flush()  
-
-        # Gather all log records from the buffer
-        log_records = [self.memory_handler.format(record) for record in self.memory_handler.buffer]
-
-        if not log_records:
-            await ctx.send("No recent log entries found.")
+    @is_mod_or_admin()
+    async def memory_logbuffer(
+        self,
+        Interaction: discord.Interaction,
+        count: int = 20,
+        level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "DEBUG",
+    ):
+        """Command to capture the most recent logs from the in-memory log buffer."""
+        await Interaction.response.defer()
+        entries = self.log_buffer.search(min_level=logging.getLevelName(level), limit=max(1, count))
+        if not entries:
+            await Interaction.followup.send("No recent log entries found.")
             return
+        await self.send_log_lines(Interaction, [format_entry(entry) for entry in entries], "logbuffer.txt")
 
-        # Combine log records but keep it under Discord's 2000 character limit
-        log_data = "\n".join(log_records)
-        if len(log_data) > 1900:
-            log_data = log_data[-1900:]  # Trim to the last 1900 characters
-
-        await ctx.send(f"```{log_data}```")
+    async def log_source_autocomplete(
+        self, Interaction: discord.Interaction, current: str
+    ) -> List[app_commands.Choice[str]]:
+        """Suggests the cogs and loggers with records in the log buffer"""
+        return [
+            app_commands.Choice(name=source, value=source)
+            for source in self.log_buffer.sources()
+            if current.lower() in source.lower()
+        ][:25]
 
-        # Clear method to clear the buffer
-        self.memory_handler.buffer.clear()
+    @admin.command(name="logsearch", description="Searches recent logs in memory by level, cog, time and text.")
+    @is_mod_or_admin()
+    @app_commands.autocomplete(source=log_source_autocomplete)
+    async def search_logbuffer(
+        self,
+        Interaction: discord.Interaction,
+        query: str = None,
+        level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "DEBUG",
+        source: str = None,
+        minutes: float = None,
+        limit: int = 50,
+    ):
+        """Searches the in-memory log buffer. query is a case-insensitive regex, source a cog or logger name."""
+        try:
+            pattern = re.compile(query, re.IGNORECASE) if query else None
+        except re.error as e:
+            await Interaction.response.send_message(f"Invalid query pattern: {e}")
+            return
+        await Interaction.response.defer()
+        entries = self.log_buffer.search(
+            min_level=logging.getLevelName(level),
+            source=source,
+            since=time.time() - minutes * 60 if minutes else None,
+            pattern=pattern,
+            limit=max(1, limit),
+        )
+        if not entries:
+            await Interaction.followup.send("No matching log entries found.")
+            return
+        await self.send_log_lines(Interaction, [format_entry(entry) for entry in entries], "logsearch.txt")
+        self.logger.info(f"{Interaction.user} searched the log buffer, {len(entries)} entries found.")
 
     # Cog command group
     cog = app_commands.Group(name="cog", description="Manage bot cogs.")
@@ -145,50 +195,72 @@ class QCAdmin(commands.Cog):
         await Interaction.response.send_message(f"Currently loaded extensions: {loaded_extensions}")
         self.logger.info("Displayed loaded extensions")
         
-    async def sync_commands(self):
-        """Syncs the bot's commands with Discord on startup."""
-        print("Bot Startup Command Sync initiated...")
-        self.logger.info("Bot Startup Command Sync initiated...")
+    async def sync_command_tree(self, force=False):
+        """Syncs the bot's commands with Discord, skipping any tree whose hash matches the last sync.
+        When DEV_GUILD_IDS is set, the global commands are copied to those guilds and only they are synced, since guild
+        syncs take effect immediately. Otherwise the commands are synced globally. Never both, as a guild that has the
+        commands globally and as guild commands shows each of them twice.
+        :param force: Sync even if nothing changed
+        :return: The number of commands synced
+        """
+        print("Command Sync initiated...")
+        self.logger.info("Command Sync initiated...")
+        state = load_sync_state()
+        dev_guilds = [discord.Object(id=guild_id) for guild_id in self.settings.dev_guild_ids]
+        targets = dev_guilds or [None]
+        synced_count = 0
+        for guild in targets:
+            if guild is not None:
+                self.bot.tree.copy_global_to(guild=guild)
+            key = "global" if guild is None else f"guild:{guild.id}"
+            tree_hash = command_tree_hash(self.bot.tree, guild)
+            if not force and state.get(key) == tree_hash:
+                self.logger.info(f"Commands for {key} unchanged, skipping sync.")
+                continue
+            try:
+                synced = await self.bot.tree.sync(guild=guild)
+            except Exception as e:
+                print(e)
+                self.logger.error(f"Error syncing commands for {key}: {e}")
+                continue
+            synced_count += len(synced)
+            state[key] = tree_hash
+            await asyncio.to_thread(save_sync_state, dict(state))
+            print(f"Command Sync Completed: Synced {len(synced)} commands for {key}.")
+            self.logger.info(f"Command Sync Completed: Synced {len(synced)} commands for {key}.")
+        return synced_count
+
+    @admin.command(name="logs", description="Fetches the last N lines from the log file and sends them in a code block.")
+    @is_mod_or_admin()
+    async def get_logs(self, Interaction: discord.Interaction, num_lines: int, grep: str = None):
+        """Fetches the last N lines from the log file, optionally only lines matching a regex, and sends them in a code block."""
+        print(f"{Interaction.user} requested the last {num_lines} lines from the log file.")
+        self.logger.info(f"{Interaction.user} requested the last {num_lines} lines from the log file.")
+        if num_lines <= 0:
+            await Interaction.response.send_message("Please enter a valid positive integer.")
+            return
         try:
-            synced = await self.bot.tree.sync()
-            print(f"Command Sync Completed: Synced {len(synced)} commands.")
-            self.logger.info(f"Command Sync Completed: Synced {len(synced)} commands.")
-        except Exception as e:
-            print(e)
-            self.logger.error(f"Error syncing commands: {e}")
-            
-    @admin.command(name="logs", description="Fetches the last N lines from the log file and sends them in a code block.")        
-    async def get_logs(self, ctx, num_lines: int):
-        """Fetches the last N lines from the log file and sends them in a code block."""
-        print(f"{ctx.author} requested the last {num_lines} lines from the log file.")
-        self.logger.info(f"{ctx.author} requested the last {num_lines} lines from the log file.")
-        log_file_path = "quantumly_confused_bot.log"  
+            pattern = re.compile(grep, re.IGNORECASE) if grep else None
+        except re.error as e:
+            await Interaction.response.send_message(f"Invalid grep pattern: {e}")
+            return
+        await Interaction.response.defer()
         try:
-            # Read the log file and get the last N lines
-            with open(log_file_path, "r", encoding="utf-8") as log_file:
-                lines = log_file.readlines()
-            # Get the last N lines
-            if num_lines <= 0:
-                await ctx.send("Please enter a valid positive integer.")
+            # Reads backwards from the end of the file in a worker thread, so the size of the log doesn't matter
+            selected_lines = await asyncio.to_thread(tail_lines, LOG_FILE, num_lines, pattern)
+            if not selected_lines:
+                await Interaction.followup.send("No matching log lines found.")
                 return
 
-            selected_lines = lines[-num_lines:]
-
-            # Create the message content and account for code block limitations
-            log_content = "".join(selected_lines)
-            if len(log_content) > 1900:  # Discord message limit for code blocks
-                log_content = log_content[-1900:]  # Trim to the last 1900 characters
-
-            # Send the logs in a code block
-            await ctx.send(f"```{log_content}```")
-            self.logger.info(f"Sent the last {num_lines} lines from the log file to {ctx.author}.")
+            await self.send_log_lines(Interaction, selected_lines, "logs.txt")
+            self.logger.info(f"Sent the last {num_lines} lines from the log file to {Interaction.user}.")
         except FileNotFoundError:
-            await ctx.send("The log file was not found. Please check the log file path.")
+            await Interaction.followup.send("The log file was not found. Please check the log file path.")
             self.logger.error("Log file not found.")
         except Exception as e:
-            await ctx.send(f"An error occurred while fetching the logs: {e}")
+            await Interaction.followup.send(f"An error occurred while fetching the logs: {e}")
             self.logger.error(f"Error fetching logs: {e}")
-    
+
     # This will affect the log level for any other cogs that use the logger        
     @admin.command(name="toggleloglevel", description="Toggles the log level between INFO and DEBUG.")
     @is_mod_or_admin()
@@ -202,14 +274,38 @@ class QCAdmin(commands.Cog):
             await ctx.send("Log level set to INFO.")
         self.logger.info(f"Log level changed to {self.logger.level}")
 
+class QCBot(commands.Bot):
+    async def setup_hook(self):
+        """Runs once after login and before connecting to the gateway, so commands are synced before any are used."""
+        await self.load_startup_extensions()
+        await self.get_cog("QCAdmin").sync_command_tree()
+
+    async def load_startup_extensions(self):
+        """Loads the extensions listed in the cog config file, if there is one
+        :return: The per-cog results from load_extensions, empty when nothing was loaded
+        """
+        config_file = get_settings().cog_config_file or COG_CONFIG_FILE
+        try:
+            extensions = read_cog_config(config_file)
+        except FileNotFoundError:
+            self.logger.info(f"No cog config at {config_file}, no cogs loaded at startup")
+            return []
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            self.logger.error(f"Failed to read the cog config {config_file}: {e}")
+            return []
+        return await load_extensions(self, extensions, self.logger)
+
 # Bot initialization and startup
 async def main():
-    bot = commands.Bot(command_prefix="/", intents=intents)
+    bot = QCBot(command_prefix="/", intents=intents)
     qc_admin = QCAdmin(bot)
     bot.logger = qc_admin.logger
     await bot.add_cog(qc_admin)
-    await bot.start(os.getenv('DISCORD_API_TOKEN'))
-    await qc_admin.sync_commands()
+    try:
+        await bot.start(qc_admin.settings.discord_api_token)
+    finally:
+        # Write out any queued log records before exiting
+        qc_admin.log_listener.stop()
 
 if __name__ == '__main__':
     asyncio.run(main())
@@ -0,0 +1,143 @@
+import os
+from functools import cached_property, lru_cache
+
+
+class SettingsError(ValueError):
+    """Raised when an environment variable is set to a value that can't be parsed"""
+
+
+def parse_int(environ, name):
+    """Reads an integer environment variable
+    :return: The value, or None when the variable is unset or empty
+    """
+    value = environ.get(name, "").strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise SettingsError(f"{name} must be an integer, got {value!r}") from None
+
+
+def parse_float(environ, name):
+    """Reads a number environment variable
+    :return: The value, or None when the variable is unset or empty
+    """
+    value = environ.get(name, "").strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise SettingsError(f"{name} must be a number, got {value!r}") from None
+
+
+def parse_int_list(environ, name):
+    """Reads a comma separated list of integers, e.g. guild IDs
+    :return: The values, empty when the variable is unset
+    """
+    values = [value.strip() for value in environ.get(name, "").split(",") if value.strip()]
+    try:
+        return [int(value) for value in values]
+    except ValueError:
+        raise SettingsError(f"{name} must be a comma separated list of integers, got {environ[name]!r}") from None
+
+
+def int_setting(name, default):
+    """A Settings attribute holding an integer variable, parsed on first use"""
+    return cached_property(lambda self: _default(parse_int(self.environ, name), default))
+
+
+def float_setting(name, default):
+    """A Settings attribute holding a number variable, parsed on first use"""
+    return cached_property(lambda self: _default(parse_float(self.environ, name), default))
+
+
+def _default(value, default):
+    return default if value is None else value
+
+
+class Settings:
+    """The bot's environment configuration, shared by main.py and every cog through get_settings()
+    Strings are read when the settings are created. Typed values are parsed on first use, so a malformed variable only
+    fails the cog that needs it, with a SettingsError naming the variable. The Grafana /grafanaset commands update the
+    attributes here, which outlives a cog reload.
+    """
+
+    def __init__(self, environ):
+        self.environ = environ
+        self.discord_api_token = environ.get("DISCORD_API_TOKEN")
+        self.cog_config_file = environ.get("COG_CONFIG_FILE")
+        self.grafana_api_token = environ.get("GRAFANA_API_TOKEN")
+        self.grafana_panel_source = environ.get("GRAFANA_PANEL_SOURCE")
+        self.grafana_uid = environ.get("GRAFANA_UID")
+        self.grafana_url = environ.get("GRAFANA_URL")
+        self.grafana_dashboard_tag = environ.get("GRAFANA_DASHBOARD_TAG")
+        self.grafana_dashboard_json = environ.get("GRAFANA_DASHBOARD_JSON", "grafana_dash_json_modal.json")
+        self.grafana_render_spool_dir = environ.get("GRAFANA_RENDER_SPOOL_DIR")
+        self.grafana_reports_file = environ.get("GRAFANA_REPORTS_FILE", "./config/grafana_reports.json")
+        self.pterodactyl_api_key = environ.get("PTERODACTYL_API_KEY")
+        self.pterodactyl_panel_url = environ.get("PTERODACTYL_PANEL_URL")
+        self.rcon_host = environ.get("RCON_HOST")
+        self.rcon_password = environ.get("RCON_PASSWORD")
+        self.gitmonitor_token = environ.get("GITMONITOR_TOKEN")
+        self.gitmonitor_poll_mode = environ.get("GITMONITOR_POLL_MODE", "commits").lower()
+        self.gitmonitor_mirror_dir = environ.get("GITMONITOR_MIRROR_DIR", "./config/gitmonitor_mirrors")
+        schemes = environ.get("GITMONITOR_MIRROR_SCHEMES", "https").split(",")
+        self.gitmonitor_mirror_schemes = [scheme.strip().lower() for scheme in schemes if scheme.strip()]
+        self.gitmonitor_webhook_secret = environ.get("GITMONITOR_WEBHOOK_SECRET")
+        self.gitmonitor_webhook_host = environ.get("GITMONITOR_WEBHOOK_HOST", "0.0.0.0")
+        self.gitmonitor_webhook_path = environ.get("GITMONITOR_WEBHOOK_PATH", "/github/webhook")
+
+    # Logging
+    log_max_mb = float_setting("LOG_MAX_MB", 10)
+    log_backup_count = int_setting("LOG_BACKUP_COUNT", 5)
+    log_buffer_size = int_setting("LOG_BUFFER_SIZE", 5000)
+    log_queue_size = int_setting("LOG_QUEUE_SIZE", 10000)
+
+    @cached_property
+    def dev_guild_ids(self):
+        return parse_int_list(self.environ, "DEV_GUILD_IDS")
+
+    # Grafana
+    grafana_render_cache_mb = int_setting("GRAFANA_RENDER_CACHE_MB", 64)
+    grafana_render_concurrency = int_setting("GRAFANA_RENDER_CONCURRENCY", 4)
+    grafana_render_queue_size = int_setting("GRAFANA_RENDER_QUEUE_SIZE", 32)
+    grafana_render_timeout = float_setting("GRAFANA_RENDER_TIMEOUT", 60)
+    grafana_dashboard_render_timeout = float_setting("GRAFANA_DASHBOARD_RENDER_TIMEOUT", 120)
+    grafana_render_memory_mb = float_setting("GRAFANA_RENDER_MEMORY_MB", 32)
+    grafana_render_spool_mb = float_setting("GRAFANA_RENDER_SPOOL_MB", 2)
+    grafana_warm_top_n = int_setting("GRAFANA_WARM_TOP_N", 5)
+    grafana_warm_quiet_seconds = float_setting("GRAFANA_WARM_QUIET_SECONDS", 30)
+    grafana_warm_interval_minutes = float_setting("GRAFANA_WARM_INTERVAL_MINUTES", 5)
+    grafana_dashboard_refresh_minutes = float_setting("GRAFANA_DASHBOARD_REFRESH_MINUTES", 10)
+    grafana_report_hash_threshold = int_setting("GRAFANA_REPORT_HASH_THRESHOLD", 3)
+    grafana_attachment_limit_mb = float_setting("GRAFANA_ATTACHMENT_LIMIT_MB", 10)
+
+    # GitMonitor
+    gitmonitor_config_flush_seconds = float_setting("GITMONITOR_CONFIG_FLUSH_SECONDS", 5)
+    gitmonitor_backfill_cap = int_setting("GITMONITOR_BACKFILL_CAP", 10)
+    gitmonitor_max_pages = int_setting("GITMONITOR_MAX_PAGES", 5)
+    gitmonitor_send_interval_seconds = float_setting("GITMONITOR_SEND_INTERVAL_SECONDS", 1.5)
+    gitmonitor_events_interval_seconds = int_setting("GITMONITOR_EVENTS_INTERVAL_SECONDS", 60)
+    gitmonitor_webhook_fallback_hours = int_setting("GITMONITOR_WEBHOOK_FALLBACK_HOURS", 24)
+    gitmonitor_webhook_port = int_setting("GITMONITOR_WEBHOOK_PORT", 8080)
+
+    # Minecraft RCON
+    rcon_port = int_setting("RCON_PORT", None)
+
+    @property
+    def rcon_configured(self):
+        """Whether the RCON host, password and port are all set"""
+        return bool(self.rcon_host and self.rcon_password and self.rcon_port)
+
+
+@lru_cache(maxsize=None)
+def get_settings():
+    """Loads .env into the environment and reads the settings, once per process
+    The environment is loaded here rather than by each module at import, so importing a cog has no side effects.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return Settings(os.environ)
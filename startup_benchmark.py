@@ -0,0 +1,207 @@
+"""Measures the bot's startup time from interpreter launch to ready, and the import cost of each module
+
+Each run starts a fresh interpreter which imports main.py, adds QCAdmin and loads the startup cogs from the cog config,
+then stops before logging in, since connecting to Discord depends on the network rather than on the bot. Runs happen in
+a temporary working directory, so they don't write to the bot's log or cog configs.
+
+Import costs come from separate runs under python -X importtime. Its report can't attribute imports made by several
+threads at once, so those runs import the cog modules one at a time before loading the cogs.
+
+Usage: python startup_benchmark.py [--runs 5] [--top 20] [--cog-config ./config/cogs.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+READY_MARKER = "STARTUP_BENCHMARK_READY "
+# Modules belonging to the bot, reported separately from third party ones
+BOT_MODULES = ("main", "settings", "log_tools", "command_sync", "cog_loader", "cogs")
+
+
+def parse_importtime(output):
+    """Parses python -X importtime output
+    :param output: The interpreter's stderr
+    :return: A dictionary of module name -> (self seconds, cumulative seconds)
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us) / 1e6, int(cumulative_us) / 1e6)
+    return modules
+
+
+def is_bot_module(name):
+    return any(name == module or name.startswith(f"{module}.") for module in BOT_MODULES)
+
+
+def run_once(cog_config, profile_imports=False):
+    """Starts one benchmark child and times it until it reports ready
+    :param cog_config: The cog config listing the startup cogs
+    :param profile_imports: Run under -X importtime, importing the cog modules serially
+    :return: A tuple of (seconds from launch to ready, the child's report, module import times)
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_DIR, os.environ.get("PYTHONPATH")])))
+    env["COG_CONFIG_FILE"] = os.path.abspath(cog_config)
+    with tempfile.TemporaryDirectory() as work_dir, tempfile.TemporaryFile("w+") as stderr:
+        # importtime output goes to a file, a pipe could fill and stall the child before it reports ready
+        started = time.perf_counter()
+        command = [sys.executable, os.path.abspath(__file__), "--child"]
+        if profile_imports:
+            command[1:1] = ["-X", "importtime"]
+            command.append("--serial-imports")
+        child = subprocess.Popen(
+            command,
+            cwd=work_dir, env=env, stdout=subprocess.PIPE, stderr=stderr, text=True,
+        )
+        report = None
+        for line in child.stdout:
+            if line.startswith(READY_MARKER):
+                elapsed = time.perf_counter() - started
+                report = json.loads(line[len(READY_MARKER):])
+        child.wait()
+        stderr.seek(0)
+        errors = stderr.read()
+    if report is None:
+        raise RuntimeError(f"The bot didn't start, exit code {child.returncode}:\n{errors[-4000:]}")
+    return elapsed, report, parse_importtime(errors)
+
+
+async def child_startup(main, phases):
+    """The startup done by main.main() and QCBot.setup_hook, up to the point the bot would log in"""
+    started = time.perf_counter()
+    bot = main.QCBot(command_prefix="/", intents=main.intents)
+    qc_admin = main.QCAdmin(bot)
+    bot.logger = qc_admin.logger
+    await bot.add_cog(qc_admin)
+    phases["QCAdmin setup"] = time.perf_counter() - started
+    started = time.perf_counter()
+    results = await bot.load_startup_extensions()
+    phases["startup cogs"] = time.perf_counter() - started
+    cogs = [
+        {
+            "name": result["name"],
+            "dependency_seconds": result["dependency_seconds"],
+            "load_seconds": result["load_seconds"],
+            "error": None if result["error"] is None else str(result["error"]),
+        }
+        for result in results
+    ]
+    qc_admin.log_listener.stop()
+    print(READY_MARKER + json.dumps({"phases": phases, "cogs": cogs}), flush=True)
+    # Exit without unloading the cogs, their sessions and loops would only add teardown noise to stderr
+    os._exit(0)
+
+
+def run_child(serial_imports):
+    phases = {}
+    started = time.perf_counter()
+    import main
+
+    phases["import main"] = time.perf_counter() - started
+    if serial_imports:
+        from cog_loader import read_cog_config
+
+        started = time.perf_counter()
+        try:
+            extensions = read_cog_config(os.environ["COG_CONFIG_FILE"])
+        except (OSError, ValueError):
+            extensions = {}
+        for name in extensions:
+            try:
+                # importlib.import_module bypasses -X importtime, the import statement machinery doesn't
+                __import__(name)
+            except Exception:
+                pass  # Reported when the cog fails to load
+        phases["import cogs serially"] = time.perf_counter() - started
+    asyncio.run(child_startup(main, phases))
+
+
+def print_table(title, rows, headers):
+    print(f"\n{title}")
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print("  " + "  ".join(str(value).rjust(width) if index else str(value).ljust(width)
+                               for index, (value, width) in enumerate(zip(row, widths))))
+
+
+def milliseconds(seconds):
+    return f"{seconds * 1000:.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bot's startup time and module import costs.")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreter launches to measure, the median is reported")
+    parser.add_argument("--top", type=int, default=20, help="How many of the slowest modules to list")
+    parser.add_argument("--cog-config", default=os.getenv("COG_CONFIG_FILE", "./config/cogs.json"),
+                        help="The cog config listing the startup cogs")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--serial-imports", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args.serial_imports)
+        return
+
+    # The first launch may compile bytecode, so it is not counted
+    run_once(args.cog_config)
+    runs = [run_once(args.cog_config) for _ in range(max(1, args.runs))]
+    profiles = [run_once(args.cog_config, profile_imports=True)[2] for _ in range(max(1, args.runs))]
+
+    totals = [elapsed for elapsed, _, _ in runs]
+    print(f"Interpreter launch to ready over {len(runs)} runs: median {milliseconds(statistics.median(totals))}, "
+          f"min {milliseconds(min(totals))}, max {milliseconds(max(totals))}")
+
+    phase_names = list(runs[0][1]["phases"])
+    print_table("Startup phases (median)", [
+        (name, milliseconds(statistics.median(report["phases"][name] for _, report, _ in runs)))
+        for name in phase_names
+    ], ("phase", "time"))
+
+    cog_names = [cog["name"] for cog in runs[0][1]["cogs"]]
+    if cog_names:
+        cog_rows = []
+        for name in cog_names:
+            results = [next(cog for cog in report["cogs"] if cog["name"] == name) for _, report, _ in runs]
+            error = results[-1]["error"]
+            cog_rows.append((
+                name,
+                milliseconds(statistics.median(result["dependency_seconds"] for result in results)),
+                milliseconds(statistics.median(result["load_seconds"] for result in results)),
+                f"failed: {error}" if error else "loaded",
+            ))
+        print_table("Startup cogs (median)", cog_rows, ("extension", "dependencies", "load", "status"))
+    else:
+        print(f"\nNo startup cogs, {args.cog_config} is missing or empty")
+
+    modules = {}
+    for imports in profiles:
+        for name, times in imports.items():
+            modules.setdefault(name, []).append(times)
+    medians = {
+        name: (statistics.median(self for self, _ in times), statistics.median(cumulative for _, cumulative in times))
+        for name, times in modules.items()
+    }
+    slowest = sorted(medians.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    print_table(f"Slowest {len(slowest)} modules by own import time (median)", [
+        (name, milliseconds(self), milliseconds(cumulative)) for name, (self, cumulative) in slowest
+    ], ("module", "self", "cumulative"))
+    bot_modules = sorted(
+        ((name, times) for name, times in medians.items() if is_bot_module(name)),
+        key=lambda item: item[1][1], reverse=True,
+    )
+    print_table("Bot modules by import time including dependencies (median)", [
+        (name, milliseconds(self), milliseconds(cumulative)) for name, (self, cumulative) in bot_modules
+    ], ("module", "self", "cumulative"))
+
+
+if __name__ == "__main__":
+    main()
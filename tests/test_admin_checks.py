@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+import pytest
+from discord import app_commands
+
+from main import QCAdmin
+
+ADMIN_COMMANDS = [
+    QCAdmin.sync_commands,
+    QCAdmin.memory_logbuffer,
+    QCAdmin.search_logbuffer,
+    QCAdmin.get_logs,
+    QCAdmin.toggle_log_level,
+]
+
+
+def interaction_for(*role_names):
+    roles = [SimpleNamespace(name=name, id=index) for index, name in enumerate(role_names)]
+    return SimpleNamespace(user=SimpleNamespace(roles=roles))
+
+
+@pytest.mark.parametrize("command", ADMIN_COMMANDS, ids=lambda command: command.name)
+def test_admin_commands_have_a_check(command):
+    assert command.checks
+
+
+@pytest.mark.parametrize("command", ADMIN_COMMANDS, ids=lambda command: command.name)
+def test_moderators_pass_and_members_are_refused(command):
+    (check,) = command.checks
+    assert check(interaction_for("Member", "Moderation Team"))
+    with pytest.raises(app_commands.MissingAnyRole):
+        check(interaction_for("Member"))
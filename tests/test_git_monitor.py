@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from cogs.git_monitor.git_monitor import GitMonitor
+
+
+class FakeResponse:
+    def __init__(self, commits, next_url=None):
+        self.commits = commits
+        self.links = {"next": {"url": next_url}} if next_url else {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return self.commits
+
+
+class FakeSession:
+    """Serves pages of commits in order and records the query parameters of each request"""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.requests = []
+
+    def get(self, url, headers=None, params=None):
+        self.requests.append((url, params))
+        commits = self.pages.pop(0)
+        return FakeResponse(commits, next_url=f"https://api.github.com/page{len(self.requests) + 1}" if self.pages else None)
+
+
+def commit(sha, committer_date):
+    return {"sha": sha, "commit": {"committer": {"date": committer_date}}}
+
+
+def fetch(pages, last_commit_sha, max_pages=5):
+    cog = SimpleNamespace(session=FakeSession(pages), logger=logging.getLogger(__name__), max_pages=max_pages)
+    result = asyncio.run(GitMonitor.fetch_commits(cog, "token", "user/repo", last_commit_sha))
+    return result, cog.session.requests
+
+
+def test_merged_commits_with_older_dates_are_returned():
+    # A merge brings in a commit authored and committed before the last seen commit
+    pages = [[commit("merge", "2024-05-03T00:00:00Z"), commit("feature", "2024-05-01T00:00:00Z")],
+             [commit("seen", "2024-05-02T00:00:00Z")]]
+    (commits, gap_closed), requests = fetch(pages, "seen")
+    assert [c["sha"] for c in commits] == ["merge", "feature"]
+    assert gap_closed
+    assert "since" not in requests[0][1]
+
+
+def test_walk_stops_at_max_pages_without_closing_the_gap():
+    pages = [[commit(f"c{page}", "2024-05-03T00:00:00Z")] for page in range(3)]
+    (commits, gap_closed), requests = fetch(pages, "seen", max_pages=2)
+    assert [c["sha"] for c in commits] == ["c0", "c1"]
+    assert not gap_closed
+    assert len(requests) == 2
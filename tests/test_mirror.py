@@ -0,0 +1,91 @@
+import logging
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from cogs.git_monitor.mirror import (
+    FIELD_SEPARATOR, LOG_FORMAT, RECORD_SEPARATOR, GitMirror, GitMirrorError, check_remote_url, parse_log,
+)
+
+
+def record(sha, message, stat=""):
+    fields = [sha, "Ada", "ada@example.com", "2024-05-01T10:00:00+00:00", "2024-05-01T10:05:00+00:00", message]
+    return RECORD_SEPARATOR + FIELD_SEPARATOR.join(fields) + FIELD_SEPARATOR + stat
+
+
+def test_parses_commits_newest_first_with_stats():
+    output = (
+        record("b" * 40, "Second\n\nWith a body\n", "\n\n 2 files changed, 5 insertions(+), 1 deletion(-)\n")
+        + record("a" * 40, "First\n", "\n\n 1 file changed, 3 insertions(+)\n")
+    )
+    commits = parse_log(output, html_base="https://github.com/user/repo")
+    assert [commit["sha"] for commit in commits] == ["b" * 40, "a" * 40]
+    assert commits[0]["html_url"] == f"https://github.com/user/repo/commit/{'b' * 40}"
+    assert commits[0]["commit"]["message"] == "Second\n\nWith a body"
+    assert commits[0]["commit"]["author"] == {"name": "Ada", "email": "ada@example.com", "date": "2024-05-01T10:00:00+00:00"}
+    assert commits[0]["commit"]["committer"] == {"date": "2024-05-01T10:05:00+00:00"}
+    assert commits[0]["stats"] == {"files_changed": 2, "additions": 5, "deletions": 1, "total": 6}
+    assert commits[1]["stats"] == {"files_changed": 1, "additions": 3, "deletions": 0, "total": 3}
+
+
+def test_commit_without_shortstat_has_zero_stats():
+    commits = parse_log(record("c" * 40, "Merge branch\n", "\n"))
+    assert commits[0]["html_url"] is None
+    assert commits[0]["stats"] == {"files_changed": 0, "additions": 0, "deletions": 0, "total": 0}
+
+
+def test_empty_output_has_no_commits():
+    assert parse_log("") == []
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_parses_real_git_log(tmp_path):
+    def git(*args):
+        return subprocess.run(
+            ["git", "-c", "user.name=Ada", "-c", "user.email=ada@example.com", *args],
+            cwd=tmp_path, capture_output=True, check=True,
+        ).stdout.decode()
+
+    git("init", "--quiet")
+    (tmp_path / "a.txt").write_text("one\ntwo\n")
+    git("add", "a.txt")
+    git("commit", "--quiet", "-m", "Add a")
+    (tmp_path / "a.txt").write_text("one\n")
+    git("commit", "--quiet", "-am", "Trim a\n\nDrops the second line")
+
+    commits = parse_log(git("log", f"--format={LOG_FORMAT}", "--shortstat"))
+    assert [commit["commit"]["message"] for commit in commits] == ["Trim a\n\nDrops the second line", "Add a"]
+    assert commits[0]["stats"] == {"files_changed": 1, "additions": 0, "deletions": 1, "total": 1}
+    assert commits[1]["stats"] == {"files_changed": 1, "additions": 2, "deletions": 0, "total": 2}
+    assert all(commit["commit"]["author"]["name"] == "Ada" for commit in commits)
+
+
+@pytest.mark.parametrize("url", ["https://github.com/user/repo.git", "HTTPS://example.com/repo.git"])
+def test_https_remotes_are_allowed(url):
+    check_remote_url(url, ["https"])
+
+
+@pytest.mark.parametrize("url", [
+    "file:///etc",
+    "/srv/repo.git",
+    "git@github.com:user/repo.git",
+    "http://127.0.0.1:8080/repo.git",
+    "ext::sh -c touch% /tmp/pwned",
+    "--upload-pack=touch /tmp/pwned",
+])
+def test_other_remotes_are_refused(url):
+    with pytest.raises(GitMirrorError):
+        check_remote_url(url, ["https"])
+
+
+def test_configured_schemes_are_allowed():
+    check_remote_url("file:///srv/repo.git", ["https", "file"])
+
+
+def test_sync_refuses_a_saved_file_url(tmp_path):
+    mirror = GitMirror(str(tmp_path), logging.getLogger(__name__))
+    with pytest.raises(GitMirrorError):
+        mirror._sync("user/repo", f"file://{tmp_path}")
+    assert not os.path.exists(mirror.mirror_path("user/repo"))
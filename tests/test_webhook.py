@@ -0,0 +1,26 @@
+from cogs.git_monitor.webhook import sign_payload, verify_signature
+
+SECRET = "webhook-secret"
+BODY = b'{"ref": "refs/heads/main", "commits": []}'
+
+
+def test_valid_signature_is_accepted():
+    assert verify_signature(SECRET, BODY, sign_payload(SECRET, BODY))
+
+
+def test_tampered_body_is_rejected():
+    signature = sign_payload(SECRET, BODY)
+    assert not verify_signature(SECRET, BODY.replace(b"main", b"evil"), signature)
+
+
+def test_signature_from_another_secret_is_rejected():
+    assert not verify_signature(SECRET, BODY, sign_payload("other-secret", BODY))
+
+
+def test_missing_header_is_rejected():
+    assert not verify_signature(SECRET, BODY, None)
+    assert not verify_signature(SECRET, BODY, "")
+
+
+def test_missing_secret_is_rejected():
+    assert not verify_signature("", BODY, sign_payload("", BODY))